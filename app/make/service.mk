@@ -11,7 +11,7 @@ IMAGE_TAG=$(TAG_PREFIX)-$(DATE_TAG)-$(GIT_SHA)
 AWS_REGION?=us-east-1
 AWS_ACCOUNT:=$(shell aws sts get-caller-identity --query Account --output text)
 
-.PHONY: sync lock dev build migrations run logs shell db clean
+.PHONY: sync lock dev build migrations test bench load run logs shell db clean
 
 sync: ## Sync Dependencies on the environment
 	uv sync
@@ -45,6 +45,15 @@ push: build
 migrations: ## Run migrations
 	uv run alembic upgrade head
 
+test: ## Run the tests
+	uv run python -m unittest
+
+bench: ## Run a benchmark against the local DB: make bench BENCH=create_path
+	uv run python -m benchmarks.$(BENCH)
+
+load: ## Load test the CRUD endpoints: make load ARGS="--concurrency 32"
+	uv run python -m benchmarks.load $(ARGS)
+
 run: sync lock ## Run development containers
 	docker-compose up -d --build && uv run alembic upgrade head
 
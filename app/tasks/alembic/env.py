@@ -10,7 +10,7 @@ from alembic import context
 
 # Import your models and Base
 from src.core.config import settings
-from src.db.models import Base, Task
+from src.db.models import Base, Task, UserTaskStats
 
 # Alembic Config object
 config = context.config
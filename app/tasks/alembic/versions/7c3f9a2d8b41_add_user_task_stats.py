@@ -0,0 +1,36 @@
+"""add user task stats
+
+Revision ID: 7c3f9a2d8b41
+Revises: de2275fea947
+Create Date: 2026-10-18 10:05:12.734519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3f9a2d8b41'
+down_revision: Union[str, Sequence[str], None] = 'de2275fea947'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Counts are filled in by `make reconcile-stats`, run once the services
+    # maintaining the table are deployed
+    op.create_table('user_task_stats',
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('open_tasks', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('completed_tasks', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_task_stats')
@@ -0,0 +1,34 @@
+"""add user tasks index
+
+Revision ID: de2275fea947
+Revises: 1e14b6d4ee57
+Create Date: 2026-10-18 09:12:37.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'de2275fea947'
+down_revision: Union[str, Sequence[str], None] = '1e14b6d4ee57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Online DDL: the index is built in place while reads and writes continue.
+    # `id` follows `user_id` so a user's tasks are read in ID order, the
+    # order of the keyset listing, without a filesort.
+    op.execute(
+        "CREATE INDEX idx_task_user_id ON tasks (user_id, id) "
+        "ALGORITHM=INPLACE LOCK=NONE"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX idx_task_user_id ON tasks ALGORITHM=INPLACE LOCK=NONE")
@@ -0,0 +1,20 @@
+import statistics
+from typing import Sequence
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = round(pct / 100 * (len(ordered) - 1))
+    return ordered[index]
+
+
+def report(name: str, samples: Sequence[float]) -> None:
+    """Print the latency distribution of samples measured in seconds"""
+    ms = [sample * 1000 for sample in samples]
+    print(
+        f"{name:<28} n={len(ms):<6} "
+        f"mean={statistics.fmean(ms):8.3f}ms "
+        f"p50={percentile(ms, 50):8.3f}ms "
+        f"p95={percentile(ms, 95):8.3f}ms "
+        f"p99={percentile(ms, 99):8.3f}ms"
+    )
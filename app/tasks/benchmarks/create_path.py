@@ -0,0 +1,80 @@
+"""Latency of the task create path with and without the post-insert refresh.
+
+Creates tasks with the previous flush + refresh sequence (INSERT + SELECT),
+with the flush alone (the INSERT), and through TaskRepository.create_task,
+which adds the user_task_stats upsert to the INSERT. The first two compare
+the refresh; the last shows what the stats cost on top of the flush.
+Every create runs in its own transaction against the configured database, as
+the endpoint does, and is rolled back to leave the tables untouched.
+
+    uv run python -m benchmarks.create_path [--iterations N]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+from src.db.engine import engine
+from src.db.models import Task
+from src.db.session import AsyncSessionLocal
+from src.schemas.tasks import TaskCreate
+from src.services.task_repository import TaskRepository
+
+from benchmarks.common import report
+
+TASK = TaskCreate(user_id=1, title="Benchmark", description="Create path benchmark")
+
+
+def new_task() -> Task:
+    return Task(user_id=TASK.user_id, title=TASK.title, description=TASK.description)
+
+
+async def create_with_refresh() -> None:
+    async with AsyncSessionLocal() as session:
+        task = new_task()
+        session.add(task)
+        await session.flush()
+        await session.refresh(task)
+        await session.rollback()
+
+
+async def create_without_refresh() -> None:
+    async with AsyncSessionLocal() as session:
+        session.add(new_task())
+        await session.flush()
+        await session.rollback()
+
+
+async def create_with_stats() -> None:
+    async with AsyncSessionLocal() as session:
+        await TaskRepository(session).create_task(TASK)
+        await session.rollback()
+
+
+async def measure(create, iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await create()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def main(iterations: int) -> None:
+    # Warm up the pool so connection setup is not measured
+    await measure(create_with_stats, 20)
+
+    report("flush + refresh", await measure(create_with_refresh, iterations))
+    report("flush only", await measure(create_without_refresh, iterations))
+    report("create_task (flush + stats)", await measure(create_with_stats, iterations))
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.iterations))
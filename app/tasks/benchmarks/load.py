@@ -0,0 +1,55 @@
+"""Load test of the task CRUD endpoints.
+
+Each iteration of a worker creates a task, reads it, lists its user's tasks,
+completes it and deletes it, so the table ends as it started. Workers write
+tasks of users of their own, far above the IDs of real users. See
+``benchmarks.loadgen`` for the options and the baseline comparison.
+
+    uv run python -m benchmarks.load [--url http://localhost:8002/tasks | --sqlite FILE]
+        [--concurrency N] [--duration S] [--save FILE | --compare FILE]
+"""
+
+import httpx
+
+from benchmarks.loadgen import Recorder, main
+
+BENCHMARK_USER_ID = 1_000_000
+
+
+async def scenario(client: httpx.AsyncClient, recorder: Recorder, worker: int) -> None:
+    user_id = BENCHMARK_USER_ID + worker
+
+    response = await recorder.request(
+        client,
+        "POST /tasks/",
+        "POST",
+        "/tasks/",
+        expected=(201,),
+        json={"user_id": user_id, "title": "Benchmark", "description": "Load test"},
+    )
+    if response is None or response.status_code != 201:
+        return
+    task_id = response.json()["id"]
+
+    await recorder.request(client, "GET /tasks/{task_id}", "GET", f"/tasks/{task_id}")
+    await recorder.request(
+        client,
+        "GET /tasks/users/{user_id}",
+        "GET",
+        f"/tasks/users/{user_id}",
+        params={"limit": 20},
+    )
+    await recorder.request(
+        client,
+        "PUT /tasks/{task_id}",
+        "PUT",
+        f"/tasks/{task_id}",
+        json={"complete": True},
+    )
+    await recorder.request(
+        client, "DELETE /tasks/{task_id}", "DELETE", f"/tasks/{task_id}"
+    )
+
+
+if __name__ == "__main__":
+    main(scenario, __doc__.splitlines()[0], "/tasks")
@@ -0,0 +1,293 @@
+"""Closed-loop HTTP load generator behind the ``load`` benchmark of each service.
+
+Each of ``--concurrency`` workers runs the service's scenario in a loop for
+``--duration`` seconds, after a ``--warmup`` whose requests are discarded.
+Requests are recorded per endpoint, named by method and route template, and
+reported as throughput and p50/p95/p99 latency. Without ``--url`` the app
+runs in process behind httpx's ASGI transport, against the configured
+database or, with ``--sqlite FILE``, against a SQLite file created on the
+fly (this needs aiosqlite, e.g. ``uv run --with aiosqlite``). SQLite runs
+one write at a time and has no replica, so its numbers only compare with
+other SQLite runs: they catch regressions of the routers and repositories,
+not of the queries MySQL plans.
+
+Results can be saved as a baseline with ``--save`` and later runs checked
+against it with ``--compare``: an endpoint regresses when its p95 latency
+grows, or its throughput drops, by more than ``--tolerance``. Regressions
+make the run exit with status 1.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import make_url
+
+from benchmarks.common import percentile
+
+
+class Recorder:
+    """Latency samples and unexpected responses of each endpoint"""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: str,
+        method: str,
+        url: str,
+        expected: Tuple[int, ...] = (200,),
+        **kwargs: Any,
+    ) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[endpoint] += 1
+            return None
+        self.samples[endpoint].append(time.perf_counter() - start)
+
+        if response.status_code not in expected:
+            self.errors[endpoint] += 1
+        return response
+
+
+Scenario = Callable[[httpx.AsyncClient, Recorder, int], Awaitable[None]]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for endpoint in sorted(recorder.samples.keys() | recorder.errors.keys()):
+        ms = [sample * 1000 for sample in recorder.samples[endpoint]] or [0.0]
+        results[endpoint] = {
+            "requests": len(recorder.samples[endpoint]),
+            "errors": recorder.errors[endpoint],
+            "throughput": round(len(recorder.samples[endpoint]) / elapsed, 2),
+            "mean_ms": round(statistics.fmean(ms), 3),
+            "p50_ms": round(percentile(ms, 50), 3),
+            "p95_ms": round(percentile(ms, 95), 3),
+            "p99_ms": round(percentile(ms, 99), 3),
+        }
+    return results
+
+
+def print_results(results: Dict[str, Dict[str, float]]) -> None:
+    print(
+        f"{'endpoint':<28} {'requests':>8} {'errors':>6} {'req/s':>9} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    )
+    for endpoint, result in results.items():
+        print(
+            f"{endpoint:<28} {result['requests']:>8} {result['errors']:>6} "
+            f"{result['throughput']:>9.1f} {result['p50_ms']:>9.3f} "
+            f"{result['p95_ms']:>9.3f} {result['p99_ms']:>9.3f}"
+        )
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+) -> List[str]:
+    """Describe the endpoints slower than the baseline beyond the tolerance"""
+    regressions = []
+    for endpoint, result in results.items():
+        before = baseline.get(endpoint)
+        if before is None:
+            continue
+
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{endpoint}: p95 {before['p95_ms']:.3f}ms -> {result['p95_ms']:.3f}ms"
+            )
+        if result["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{endpoint}: throughput {before['throughput']:.1f} -> "
+                f"{result['throughput']:.1f} req/s"
+            )
+        if result["errors"] > before["errors"]:
+            regressions.append(
+                f"{endpoint}: errors {before['errors']} -> {result['errors']}"
+            )
+    return regressions
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _package_versions() -> Dict[str, str]:
+    versions = {}
+    for package in ("fastapi", "starlette", "pydantic", "sqlalchemy"):
+        with contextlib.suppress(metadata.PackageNotFoundError):
+            versions[package] = metadata.version(package)
+    return versions
+
+
+def _database(args: argparse.Namespace) -> Optional[str]:
+    if args.url:
+        return None
+    if args.sqlite:
+        return f"sqlite {sqlite3.sqlite_version}"
+
+    from src.core.config import settings
+
+    return make_url(settings.DATABASE_URL).get_backend_name()
+
+
+def save_baseline(path: Path, args: argparse.Namespace, results: Dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "packages": _package_versions(),
+        "target": args.url or "in-process",
+        "database": _database(args),
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "endpoints": results,
+    }
+    path.write_text(json.dumps(baseline, indent=2) + "\n")
+    print(f"Saved baseline to {path}")
+
+
+async def _drive(
+    scenario: Scenario, client: httpx.AsyncClient, concurrency: int, duration: float
+) -> Tuple[Recorder, float]:
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    async def worker(number: int) -> None:
+        while time.perf_counter() < deadline:
+            await scenario(client, recorder, number)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    return recorder, time.perf_counter() - start
+
+
+def _use_sqlite(path: Path) -> None:
+    """Point the app at a SQLite file, before its settings are read"""
+    os.environ["DATABASE_URL_OVERRIDE"] = f"sqlite+aiosqlite:///{path}"
+    # Required by the settings, unused with the override
+    for name, value in (
+        ("DATABASE_HOST", "localhost"),
+        ("DATABASE_PORT", "3306"),
+        ("DATABASE_USER", "bench"),
+        ("DATABASE_PASSWORD", "bench"),
+        ("DATABASE_NAME", "bench"),
+    ):
+        os.environ.setdefault(name, value)
+
+
+async def _create_schema() -> None:
+    from src.db.engine import engine
+    from src.db.models import Base
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def _run(
+    scenario: Scenario, args: argparse.Namespace, base_path: str
+) -> Dict[str, Dict[str, float]]:
+    if args.url:
+        client = httpx.AsyncClient(
+            base_url=args.url,
+            limits=httpx.Limits(max_connections=args.concurrency),
+            timeout=30,
+        )
+        running = contextlib.nullcontext()
+    else:
+        if args.sqlite:
+            _use_sqlite(args.sqlite)
+        from src.main import app, lifespan
+
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url=f"http://bench{base_path}",
+            timeout=30,
+        )
+        running = lifespan(app)
+
+    async with running, client:
+        if args.sqlite:
+            await _create_schema()
+        await _drive(scenario, client, args.concurrency, args.warmup)
+        recorder, elapsed = await _drive(
+            scenario, client, args.concurrency, args.duration
+        )
+    return summarize(recorder, elapsed)
+
+
+def main(scenario: Scenario, description: str, base_path: str) -> None:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--url", help=f"Base URL of a running service, ending in {base_path}"
+    )
+    parser.add_argument(
+        "--sqlite", type=Path, help="Run in process against this SQLite file"
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds")
+    parser.add_argument("--save", type=Path, help="Write the results as a baseline")
+    parser.add_argument("--compare", type=Path, help="Baseline to check against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed p95 growth and throughput drop, as a fraction",
+    )
+    args = parser.parse_args()
+    if args.url and args.sqlite:
+        parser.error("--sqlite runs the app in process, it cannot go with --url")
+
+    results = asyncio.run(_run(scenario, args, base_path))
+    print_results(results)
+
+    if args.save:
+        save_baseline(args.save, args, results)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline["concurrency"] != args.concurrency:
+            print(
+                f"Baseline ran at concurrency {baseline['concurrency']}, "
+                f"results may not be comparable"
+            )
+        regressions = compare(results, baseline["endpoints"], args.tolerance)
+        if regressions:
+            print(f"Regressions against {args.compare}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
@@ -0,0 +1,111 @@
+"""Cost of reading a page of tasks as ORM entities versus projected rows.
+
+Seeds ``--rows`` tasks for one user inside a transaction, then reads them
+through ``select(Task)`` (identity-mapped entities, the previous path) and
+through the column projection TaskRepository uses, serializing each page to
+JSON as the list endpoint does. Reports the latency of every read and the
+memory allocated per row. The transaction is rolled back at the end.
+
+    uv run python -m benchmarks.projection [--rows N] [--iterations N]
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.engine import engine
+from src.db.models import Task
+from src.db.session import AsyncSessionLocal
+from src.schemas.tasks import TaskResponseList
+from src.services.task_repository import TaskRepository
+
+from benchmarks.common import report
+
+USER_ID = 1_000_000
+
+Read = Callable[[AsyncSession, int], Awaitable[bytes]]
+
+
+async def read_entities(session: AsyncSession, rows: int) -> bytes:
+    result = await session.execute(
+        select(Task).where(Task.user_id == USER_ID).order_by(Task.id).limit(rows)
+    )
+    tasks = result.scalars().all()
+    payload = TaskResponseList.dump_json(
+        TaskResponseList.validate_python(tasks, from_attributes=True)
+    )
+    # Entities stay in the identity map until the session ends; a request
+    # would drop them with its session, so do not let them pile up here
+    session.expunge_all()
+    return payload
+
+
+async def read_rows(session: AsyncSession, rows: int) -> bytes:
+    tasks = await TaskRepository(session).get_tasks_per_user(USER_ID, rows)
+    return TaskResponseList.dump_json(
+        TaskResponseList.validate_python(tasks, from_attributes=True)
+    )
+
+
+async def measure(
+    read: Read, session: AsyncSession, rows: int, iterations: int
+) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await read(session, rows)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def allocated_per_row(read: Read, session: AsyncSession, rows: int) -> float:
+    tracemalloc.start()
+    await read(session, rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / rows
+
+
+async def main(rows: int, iterations: int) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            insert(Task),
+            [
+                {
+                    "user_id": USER_ID,
+                    "title": f"Task {i}",
+                    "description": "Projection benchmark",
+                }
+                for i in range(rows)
+            ],
+        )
+
+        # Warm up statement caches so compilation is not measured
+        await measure(read_entities, session, rows, 5)
+        await measure(read_rows, session, rows, 5)
+
+        for name, read in (
+            ("ORM entities (before)", read_entities),
+            ("projected rows (after)", read_rows),
+        ):
+            report(name, await measure(read, session, rows, iterations))
+            per_row = await allocated_per_row(read, session, rows)
+            print(f"{'':<28} peak allocation {per_row:,.0f} bytes/row")
+
+        await session.rollback()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.iterations))
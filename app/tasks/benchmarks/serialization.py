@@ -0,0 +1,87 @@
+"""Cost of serializing a task list response, before and after ModelResponse.
+
+Serves the same ORM objects from two in-process routes. The first returns a
+list of TaskResponse built one by one, which FastAPI then validates again
+through response_model. The second returns a ModelResponse. No database is
+needed.
+
+    uv run python -m benchmarks.serialization [--rows N] [--iterations N]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+
+from src.core.responses import ModelResponse
+from src.db.models import Task, utc_now
+from src.schemas.tasks import TaskResponse, TaskResponseList
+
+from benchmarks.common import report
+
+
+def build_app(tasks: List[Task]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/before", response_model=List[TaskResponse])
+    async def before() -> List[TaskResponse]:
+        return [TaskResponse.model_validate(task) for task in tasks]
+
+    @app.get("/after", response_model=List[TaskResponse])
+    async def after() -> ModelResponse:
+        return ModelResponse(tasks, TaskResponseList)
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def main(rows: int, iterations: int) -> None:
+    now = utc_now()
+    tasks = [
+        Task(
+            id=i,
+            user_id=1,
+            title=f"Task {i}",
+            description="Serialization benchmark",
+            complete=bool(i % 2),
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(1, rows + 1)
+    ]
+
+    transport = httpx.ASGITransport(app=build_app(tasks))
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        before = await client.get("/before")
+        after = await client.get("/after")
+        assert before.json() == after.json()
+
+        report(
+            f"{rows} rows, response_model", await measure(client, "/before", iterations)
+        )
+        report(
+            f"{rows} rows, ModelResponse", await measure(client, "/after", iterations)
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.iterations))
@@ -0,0 +1,110 @@
+"""Query plan regression check for the per-user task queries.
+
+Runs the TaskRepository user queries against the configured database, captures
+the SQL they emit and fails when the EXPLAIN plan of any of them stops using
+the ``idx_task_user_id`` index, or sorts or buffers the rows (``Using
+filesort`` or ``Using temporary``) instead of reading them in index order.
+
+    uv run python -m scripts.check_query_plans [--seed ROWS]
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Any, List, Tuple
+
+from sqlalchemy import event, insert, text
+
+from src.db.engine import engine
+from src.db.models import Task
+from src.db.session import AsyncSessionLocal
+from src.services.task_repository import TaskRepository
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "idx_task_user_id"
+UNWANTED_EXTRA = ("Using filesort", "Using temporary")
+USER_ID = 1
+
+
+async def seed(rows: int) -> None:
+    """Insert synthetic tasks spread over 1000 users and refresh table stats"""
+    values = [
+        {
+            "user_id": i % 1000 + 1,
+            "title": f"Task {i}",
+            "description": "Query plan check",
+            "complete": i % 3 == 0,
+        }
+        for i in range(rows)
+    ]
+    async with engine.begin() as conn:
+        await conn.execute(insert(Task), values)
+        await conn.execute(text("ANALYZE TABLE tasks"))
+
+
+async def capture_statements() -> List[Tuple[str, Any]]:
+    """Run the repository user queries and return the SQL they executed"""
+    statements: List[Tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with AsyncSessionLocal() as session:
+            repo = TaskRepository(session)
+            await repo.get_tasks_per_user(USER_ID, limit=100)
+            await repo.get_tasks_per_user(USER_ID, limit=100, after=1)
+            async for _ in repo.stream_tasks_per_user(USER_ID):
+                break
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    return statements
+
+
+async def explain(statement: str, parameters: Any) -> List[dict]:
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        return [dict(row._mapping) for row in result]
+
+
+async def main(rows: int) -> int:
+    if rows:
+        await seed(rows)
+
+    failures = 0
+    for statement, parameters in await capture_statements():
+        for plan in await explain(statement, parameters):
+            if plan.get("table") != Task.__tablename__:
+                continue
+
+            extra = plan.get("Extra") or ""
+            if plan.get("key") != INDEX_NAME:
+                failures += 1
+                logger.error("Index not used: %s\n%s", plan, statement)
+            elif any(unwanted in extra for unwanted in UNWANTED_EXTRA):
+                failures += 1
+                logger.error("Rows not read in index order: %s\n%s", plan, statement)
+            else:
+                logger.info("OK (%s, %s): %s", plan["type"], plan["key"], statement)
+
+    await engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        metavar="ROWS",
+        help="insert ROWS synthetic tasks before checking (local databases only)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(format="%(levelname)s %(message)s", level=logging.INFO)
+    sys.exit(asyncio.run(main(args.seed)))
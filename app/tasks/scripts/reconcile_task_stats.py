@@ -0,0 +1,56 @@
+"""Backfill or repair the per-user task counts of the user_task_stats table.
+
+Recounts the tasks of every user in ranges of ``--batch`` user IDs, each in a
+short transaction of its own, and rewrites the counts that disagree. It is
+safe to run while the service writes tasks (see
+TaskRepository.reconcile_user_task_stats). Run it once after deploying the
+migration that creates the table, and again whenever drift is suspected.
+
+    uv run python -m scripts.reconcile_task_stats [--batch N]
+"""
+
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import func, select
+
+from src.db.engine import engine
+from src.db.models import Task, UserTaskStats
+from src.db.session import AsyncSessionLocal
+from src.services.task_repository import TaskRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def main(batch: int) -> None:
+    async with AsyncSessionLocal() as session:
+        last_user_id = max(
+            await session.scalar(select(func.max(Task.user_id))) or 0,
+            await session.scalar(select(func.max(UserTaskStats.user_id))) or 0,
+        )
+
+    corrected = 0
+    for first_user_id in range(1, last_user_id + 1, batch):
+        async with AsyncSessionLocal() as session:
+            repo = TaskRepository(session)
+            corrected += await repo.reconcile_user_task_stats(
+                first_user_id, first_user_id + batch - 1
+            )
+            await session.commit()
+
+    logger.info(
+        "Corrected the counts of %d users, up to user %d", corrected, last_user_id
+    )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--batch", type=int, default=1000, help="user IDs recounted per transaction"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(format="%(levelname)s %(message)s", level=logging.INFO)
+    asyncio.run(main(args.batch))
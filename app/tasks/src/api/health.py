@@ -1,26 +1,66 @@
-import logging
-
-from sqlalchemy import text
 from fastapi import APIRouter, status
 from fastapi.responses import JSONResponse
 
-from src.db.session import AsyncSessionLocal
-
-logger = logging.getLogger(__name__)
+from src.core.health import pool_stats, prober
+from src.db.engine import engine, read_engine
+from src.db.resilience import primary_breaker, replica_breaker
 
 router = APIRouter(prefix="/health", tags=["Health"])
 
 
 @router.get("/")
 async def health_check():
-    """Health check endpoint"""
-    try:
-        async with AsyncSessionLocal() as session:
-            await session.execute(text("SELECT 1"))
+    """Health check endpoint, answered from the last background database probe"""
+    if prober.healthy:
         return {"status": "healthy", "database": "connected"}
-    except Exception as e:
-        logger.exception("Health check failed %s", str(e))
-        return JSONResponse(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            content={"status": "unhealthy", "database": "disconnected"},
-        )
+
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "unhealthy", "database": "disconnected"},
+    )
+
+
+@router.get("/live")
+async def liveness():
+    """The process is up and its event loop is serving requests"""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness():
+    """Whether the writer is reachable, with replica reachability, pool usage
+    and the state of the circuit breakers.
+
+    An unreachable replica degrades reads but does not take the task out of
+    service.
+    """
+    primary, replica = prober.primary, prober.replica
+    replica_healthy = replica is not None and replica.healthy and replica.fresh
+
+    if not prober.healthy:
+        state = "unavailable"
+    elif not replica_healthy:
+        state = "degraded"
+    else:
+        state = "ready"
+
+    return JSONResponse(
+        status_code=(
+            status.HTTP_200_OK
+            if prober.healthy
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        content={
+            "status": state,
+            "primary": primary.to_dict() if primary else None,
+            "replica": replica.to_dict() if replica else None,
+            "pools": {
+                "primary": pool_stats(engine),
+                "replica": pool_stats(read_engine),
+            },
+            "circuits": {
+                breaker.name: "open" if breaker.is_open else "closed"
+                for breaker in (primary_breaker, replica_breaker)
+            },
+        },
+    )
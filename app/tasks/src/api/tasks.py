@@ -1,15 +1,39 @@
 import logging
-from typing import Annotated, List
+from typing import Annotated, AsyncIterator, List, Optional
 
-from fastapi import APIRouter, HTTPException, status, Depends, Path, Response
+from fastapi import (
+    APIRouter,
+    Body,
+    HTTPException,
+    status,
+    Depends,
+    Path,
+    Query,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.schemas.tasks import TaskCreate, TaskResponse, TaskUpdate
-from src.core.dependencies import get_db
+from src.schemas.tasks import (
+    TaskBatch,
+    TaskBatchResponse,
+    TaskCreate,
+    TaskResponse,
+    TaskResponseList,
+    TaskStatsResponse,
+    TaskUpdate,
+)
+from src.core.config import settings
+from src.core.dependencies import get_db, get_read_db
+from src.core.responses import ModelResponse
 from src.services.task_repository import TaskRepository
 
 logger = logging.getLogger(__name__)
 
+# Comma-separated positive IDs, e.g. 1,2,3
+IDS_PATTERN = r"^[1-9][0-9]{0,9}(,[1-9][0-9]{0,9})*$"
+
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
 
@@ -21,7 +45,7 @@ router = APIRouter(prefix="/tasks", tags=["Tasks"])
     response_model=TaskResponse,
 )
 async def create_task(
-    task: TaskCreate, db: AsyncSession = Depends(get_db)
+    task: TaskCreate, db: AsyncSession = Depends(get_db, scope="function")
 ) -> TaskResponse:
     repo = TaskRepository(db)
 
@@ -30,6 +54,59 @@ async def create_task(
     return TaskResponse.model_validate(response)
 
 
+@router.post(
+    "/bulk",
+    status_code=status.HTTP_201_CREATED,
+    description="Create many tasks in a single transaction",
+    response_description="Tasks created successfully",
+    response_model=List[TaskResponse],
+)
+async def create_tasks(
+    tasks: Annotated[
+        List[TaskCreate],
+        Body(min_length=1, max_length=settings.TASKS_BULK_MAX_SIZE),
+    ],
+    db: AsyncSession = Depends(get_db, scope="function"),
+) -> List[TaskResponse]:
+    logger.info("Creating %d tasks", len(tasks))
+
+    repo = TaskRepository(db)
+
+    return await repo.create_tasks(tasks)
+
+
+@router.get(
+    "/",
+    status_code=status.HTTP_200_OK,
+    description=(
+        "Get many tasks by ID in one request. Tasks are keyed by ID; "
+        "IDs without a task are listed in `missing`"
+    ),
+    response_description="Tasks retrieved successfully",
+    response_model=TaskBatchResponse,
+)
+async def get_tasks(
+    ids: Annotated[
+        str, Query(description="Comma-separated task IDs", pattern=IDS_PATTERN)
+    ],
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    task_ids = list(dict.fromkeys(int(id) for id in ids.split(",")))
+    if len(task_ids) > settings.TASKS_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.TASKS_BATCH_MAX_IDS} IDs per request",
+        )
+
+    logger.info("Retrieving %d tasks", len(task_ids))
+
+    repo = TaskRepository(db)
+    tasks = await repo.get_tasks_by_ids(task_ids)
+
+    missing = [id for id in task_ids if id not in tasks]
+    return ModelResponse({"tasks": tasks, "missing": missing}, TaskBatch)
+
+
 @router.get(
     "/{task_id}",
     status_code=status.HTTP_200_OK,
@@ -39,9 +116,9 @@ async def create_task(
 )
 async def get_task(
     task_id: Annotated[int, Path(title="The Id of the task to get", gt=0)],
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> TaskResponse:
-    logging.info("Retrieving task")
+    logger.info("Retrieving task")
 
     repo = TaskRepository(db)
     response = await repo.get_task_by_id(task_id)
@@ -57,10 +134,23 @@ async def get_task(
 @router.get(
     "/users/{user_id}",
     status_code=status.HTTP_200_OK,
-    description="Get all the tasks of user with user_id",
+    description=(
+        "Get the tasks of user with user_id, paginated by task ID. "
+        "Pass the X-Next-Cursor header value as `after` to fetch the next page, "
+        "or set `stream` to receive every task as NDJSON"
+    ),
     response_description="Task retrieved successfully",
     response_model=List[TaskResponse],
     responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "headers": {
+                "X-Next-Cursor": {
+                    "description": "Cursor of the next page, absent on the last page",
+                    "schema": {"type": "integer"},
+                }
+            },
+        },
         204: {
             "description": "No tasks found for user",
             "headers": {
@@ -74,21 +164,82 @@ async def get_task(
 )
 async def get_tasks_per_user(
     user_id: Annotated[int, Path(title="The Id of the user to get tasks to", gt=0)],
-    db: AsyncSession = Depends(get_db),
-) -> List[TaskResponse] | Response:
-    logging.info("Retrieving all tasks of a user")
+    limit: Annotated[
+        int,
+        Query(
+            description="Maximum number of tasks to return",
+            ge=1,
+            le=settings.TASKS_MAX_PAGE_SIZE,
+        ),
+    ] = settings.TASKS_PAGE_SIZE,
+    after: Annotated[
+        Optional[int],
+        Query(
+            description="Return only tasks with an ID greater than this cursor", ge=0
+        ),
+    ] = None,
+    stream: Annotated[
+        bool, Query(description="Stream all the tasks after the cursor as NDJSON")
+    ] = False,
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    logger.info("Retrieving all tasks of a user")
 
     repo = TaskRepository(db)
-    response = await repo.get_tasks_per_user(user_id)
 
-    if not response:
+    if stream:
+        return StreamingResponse(
+            _ndjson(repo.stream_tasks_per_user(user_id, after)),
+            media_type="application/x-ndjson",
+        )
+
+    tasks = await repo.get_tasks_per_user(user_id, limit + 1, after)
+
+    if not tasks:
         logger.info("User does not have tasks")
         return Response(
             status_code=status.HTTP_204_NO_CONTENT,
             headers={"X-Message": "No tasks found for this user"},
         )
 
-    return [TaskResponse.model_validate(task) for task in response]
+    headers = {}
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        headers["X-Next-Cursor"] = str(tasks[-1].id)
+
+    return ModelResponse(tasks, TaskResponseList, headers=headers)
+
+
+@router.get(
+    "/users/{user_id}/stats",
+    status_code=status.HTTP_200_OK,
+    description="Get the number of open and completed tasks of a user",
+    response_description="Task counts retrieved successfully",
+    response_model=TaskStatsResponse,
+)
+async def get_user_task_stats(
+    user_id: Annotated[int, Path(title="The Id of the user to count tasks of", gt=0)],
+    db: AsyncSession = Depends(get_read_db),
+) -> TaskStatsResponse:
+    logger.info("Retrieving task counts of a user")
+
+    repo = TaskRepository(db)
+    stats = await repo.get_user_task_stats(user_id)
+
+    if stats is None:
+        return TaskStatsResponse(user_id=user_id, open=0, completed=0, total=0)
+
+    return TaskStatsResponse(
+        user_id=user_id,
+        open=stats.open_tasks,
+        completed=stats.completed_tasks,
+        total=stats.open_tasks + stats.completed_tasks,
+    )
+
+
+async def _ndjson(tasks: AsyncIterator[Row]) -> AsyncIterator[bytes]:
+    async for task in tasks:
+        yield TaskResponse.model_validate(task).model_dump_json().encode() + b"\n"
 
 
 @router.put(
@@ -101,7 +252,7 @@ async def get_tasks_per_user(
 async def update_task(
     task_id: Annotated[int, Path(title="The task ID to update", gt=0)],
     task_update: TaskUpdate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ) -> TaskResponse:
     if not task_update.model_dump(exclude_unset=True):
         raise HTTPException(
@@ -109,17 +260,11 @@ async def update_task(
         )
 
     repo = TaskRepository(db)
-    task = await repo.get_task_by_id(task_id)
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Task does not exist"
-        )
-
     response = await repo.update_task(task_id, task_update)
 
     if not response:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task does not exist"
         )
 
     return TaskResponse.model_validate(response)
@@ -133,7 +278,7 @@ async def update_task(
 )
 async def delete_task(
     task_id: Annotated[int, Path(title="The ID of the task to delete", gt=0)],
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ) -> None:
     repo = TaskRepository(db)
 
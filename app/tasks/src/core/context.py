@@ -0,0 +1,124 @@
+"""State of the request being served, reachable from any code it runs.
+
+The metrics middleware opens a RequestContext per request; database event
+listeners add the statements they see to it. Repository classes decorated
+with ``tag_repository`` name the method running, so statements and slow
+queries can be traced back to it, and open a span around it in sampled
+traces. ``RequestIdMiddleware`` sets the request ID that log records carry.
+"""
+
+import functools
+import inspect
+import re
+import uuid
+from contextvars import ContextVar
+from typing import Optional, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.tracing import current_span, start_child_span
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+C = TypeVar("C", bound=type)
+
+
+class RequestContext:
+    __slots__ = ("scope", "db_statements", "db_seconds")
+
+    def __init__(self, scope: Scope) -> None:
+        self.scope = scope
+        self.db_statements = 0
+        self.db_seconds = 0.0
+
+    @property
+    def method(self) -> str:
+        return self.scope["method"]
+
+    @property
+    def route(self) -> Optional[str]:
+        """Template of the matched route, once the router has matched one"""
+        return getattr(self.scope.get("route"), "path_format", None)
+
+
+request_context: ContextVar[Optional[RequestContext]] = ContextVar(
+    "request_context", default=None
+)
+repository_method: ContextVar[Optional[str]] = ContextVar(
+    "repository_method", default=None
+)
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def tag_repository(cls: C) -> C:
+    """Record the public coroutine method running in ``repository_method``"""
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, _tagged(method, f"{cls.__name__}.{name}"))
+    return cls
+
+
+def _tagged(method, tag: str):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = repository_method.set(tag)
+        span = start_child_span(tag, attributes={"code.function": tag})
+        if span is None:
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                repository_method.reset(token)
+
+        span_token = current_span.set(span)
+        try:
+            return await method(*args, **kwargs)
+        except Exception as error:
+            span.set_error(error)
+            raise
+        finally:
+            current_span.reset(span_token)
+            repository_method.reset(token)
+            span.end()
+
+    return wrapper
+
+
+class RequestIdMiddleware:
+    """Use the caller's X-Request-ID, or a new one, and send it back.
+
+    Callers propagating an ID get their logs correlated with ours; invalid
+    values are replaced so they cannot inject into the logs.
+    """
+
+    header = REQUEST_ID_HEADER.lower().encode()
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        value = None
+        for name, header in scope["headers"]:
+            if name == self.header:
+                value = header.decode("latin-1")
+                break
+        if value is None or not _REQUEST_ID_PATTERN.fullmatch(value):
+            value = uuid.uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((self.header, value.encode()))
+                message["headers"] = headers
+            await send(message)
+
+        token = request_id.set(value)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id.reset(token)
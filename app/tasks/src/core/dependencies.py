@@ -1,25 +1,90 @@
+import time
 from typing import AsyncGenerator
+from fastapi import Request, Response
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.cache import discard_invalidations, invalidate_committed
+from src.core.config import settings
+from src.db.resilience import (
+    DatabaseUnavailableError,
+    primary_breaker,
+    replica_breaker,
+)
 from src.db.session import AsyncSessionLocal, AsyncReadSessionLocal
 
+# Read-your-writes window: responses to writes carry the time until which the
+# client's reads are served by the writer instead of a possibly lagging replica.
+# Browsers send it back as a cookie, service clients echo the header.
+PRIMARY_UNTIL_COOKIE = "db_primary_until"
+PRIMARY_UNTIL_HEADER = "X-DB-Primary-Until"
+
+
+async def get_db(response: Response) -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for writes, committed once the route returns.
+
+    Routes declare it with ``scope="function"``, so the commit and its errors
+    (a lost connection becomes a 503) happen before the response is sent;
+    with the default scope a failed commit would follow a 2xx.
+    """
+    primary_breaker.check()
+    _pin_to_primary(response)
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         try:
             yield session
             await session.commit()
-        except Exception:
+            await invalidate_committed(session)
+        except Exception as error:
+            discard_invalidations(session)
             await session.rollback()
+            # Writes are not retried, the client decides whether to try again
+            if isinstance(error, DBAPIError) and error.connection_invalidated:
+                raise DatabaseUnavailableError(primary_breaker.name) from error
             raise
         finally:
             await session.close()
 
 
-async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """Dependency for read-only operations (uses read replicas)"""
-    async with AsyncReadSessionLocal() as session:
+    if _is_pinned_to_primary(request):
+        primary_breaker.check()
+        session_factory = AsyncSessionLocal
+    else:
+        replica_breaker.check()
+        session_factory = AsyncReadSessionLocal
+
+    async with session_factory() as session:
         try:
             yield session
         finally:
             await session.close()
+
+
+def _pin_to_primary(response: Response) -> None:
+    window = settings.DB_READ_STICKY_SECONDS
+    if window <= 0:
+        return
+
+    until = str(int(time.time()) + window)
+    response.headers[PRIMARY_UNTIL_HEADER] = until
+    response.set_cookie(PRIMARY_UNTIL_COOKIE, until, max_age=window, httponly=True)
+
+
+def _is_pinned_to_primary(request: Request) -> bool:
+    until = request.headers.get(PRIMARY_UNTIL_HEADER) or request.cookies.get(
+        PRIMARY_UNTIL_COOKIE
+    )
+    if not until:
+        return False
+
+    try:
+        until = int(until)
+    except ValueError:
+        return False
+
+    # The value comes from the client: one further out than a write could have
+    # set would pin its reads to the writer for good
+    now = time.time()
+    return now < until <= now + settings.DB_READ_STICKY_SECONDS
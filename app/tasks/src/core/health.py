@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from src.core.config import settings
+from src.db.engine import engine, read_engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    healthy: bool
+    checked_at: float
+    latency_ms: float
+    error: Optional[str] = None
+
+    @property
+    def fresh(self) -> bool:
+        # A prober that stopped running must not keep reporting healthy
+        max_age = 3 * settings.HEALTH_CHECK_INTERVAL_SECONDS
+        return time.time() - self.checked_at <= max_age
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "fresh": self.fresh}
+
+
+async def probe(name: str, engine: AsyncEngine) -> ProbeResult:
+    """Run ``SELECT 1`` on a pooled connection"""
+    start = time.perf_counter()
+    error = None
+    try:
+        async with asyncio.timeout(settings.HEALTH_CHECK_TIMEOUT_SECONDS):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        # Health responses are public, only the logs get the details
+        logger.warning("Database %s probe failed: %r", name, e)
+        error = type(e).__name__
+
+    return ProbeResult(
+        healthy=error is None,
+        checked_at=time.time(),
+        latency_ms=round((time.perf_counter() - start) * 1000, 3),
+        error=error,
+    )
+
+
+async def ping_idle_connections(name: str, engine: AsyncEngine) -> int:
+    """Run ``SELECT 1`` on each idle pooled connection, returning how many passed.
+
+    Stands in for a ping on every checkout: a connection that died while idle
+    is found here rather than by a request, and its disconnect reconnects the
+    pool. The pool hands out its oldest idle connection first, so checking out
+    as many connections as are idle, one after the other, visits each once.
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return 0
+
+    pinged = 0
+    try:
+        async with asyncio.timeout(settings.HEALTH_CHECK_TIMEOUT_SECONDS):
+            for _ in range(pool.checkedin()):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                pinged += 1
+    except Exception as e:
+        logger.warning("Database %s idle connection ping failed: %r", name, e)
+    return pinged
+
+
+def pool_stats(engine: AsyncEngine) -> Optional[Dict[str, Any]]:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+
+    capacity = pool.size() + settings.DB_MAX_OVERFLOW
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+    }
+
+
+class HealthProber:
+    """Probes the databases in the background so health checks never touch them.
+
+    Load balancer and container health checks hit every task constantly; they
+    are served from the last probe results instead of a query each. Each
+    refresh also pings the connections idle in the pools.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.primary: Optional[ProbeResult] = None
+        self.replica: Optional[ProbeResult] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.primary is not None and self.primary.healthy and self.primary.fresh
+
+    async def refresh(self) -> None:
+        self.primary, self.replica = await asyncio.gather(
+            probe("primary", engine), probe("replica", read_engine)
+        )
+        await asyncio.gather(
+            ping_idle_connections("primary", engine),
+            ping_idle_connections("replica", read_engine),
+        )
+
+    async def start(self) -> None:
+        await self.refresh()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Database health probe failed")
+
+
+prober = HealthProber(settings.HEALTH_CHECK_INTERVAL_SECONDS)
+
+
+async def start_health_prober() -> None:
+    await prober.start()
+
+
+async def close_health_prober() -> None:
+    await prober.close()
@@ -0,0 +1,99 @@
+"""Per-route request metrics, including the time each request spent in the database.
+
+``MetricsMiddleware`` is a plain ASGI middleware: it adds a few counter and
+histogram updates per request and never buffers bodies. It also opens the
+RequestContext, to which the database event listeners add the statements of
+the request.
+"""
+
+import time
+from typing import Dict, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.context import RequestContext, request_context
+from src.core.metrics import Counter, Gauge, Histogram
+
+UNMATCHED_ROUTE = "unmatched"
+
+requests_total = Counter(
+    "http_requests_total", "Requests served", ["method", "route", "status"]
+)
+request_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve a request, until the last body chunk is sent",
+    ["method", "route"],
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds",
+    "Time a request spent executing database statements",
+    ["method", "route"],
+)
+request_db_statements = Histogram(
+    "http_request_db_statements",
+    "Database statements executed by a request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+)
+response_bytes = Histogram(
+    "http_response_size_bytes",
+    "Size of the response bodies",
+    ["method", "route"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+in_flight = Gauge("http_requests_in_flight", "Requests being served")
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.in_flight = in_flight.labels()
+        # Labelled series of each (method, route, status), looked up once
+        self._series: Dict[Tuple[str, str, int], Tuple] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        context = RequestContext(scope)
+        token = request_context.set(context)
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.dec()
+            request_context.reset(token)
+
+            # Label by the route template so IDs in paths do not create series
+            key = (context.method, context.route or UNMATCHED_ROUTE, status)
+            series = self._series.get(key) or self._create_series(key)
+
+            series[0].inc()
+            series[1].observe(time.perf_counter() - start)
+            series[2].observe(context.db_seconds)
+            series[3].observe(context.db_statements)
+            series[4].observe(size)
+
+    def _create_series(self, key: Tuple[str, str, int]) -> Tuple:
+        method, path, status = key
+        series = self._series[key] = (
+            requests_total.labels(method, path, str(status)),
+            request_seconds.labels(method, path),
+            request_db_seconds.labels(method, path),
+            request_db_statements.labels(method, path),
+            response_bytes.labels(method, path),
+        )
+        return series
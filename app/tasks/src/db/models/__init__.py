@@ -1,4 +1,5 @@
-from src.db.models.base import Base
+from src.db.models.base import Base, current_timestamp_on_update, utc_now
 from src.db.models.tasks import Task
+from src.db.models.user_task_stats import UserTaskStats
 
-__all__ = ["Base", "Task"]
+__all__ = ["Base", "Task", "UserTaskStats", "current_timestamp_on_update", "utc_now"]
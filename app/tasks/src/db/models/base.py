@@ -1,5 +1,36 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.sql.functions import FunctionElement
 
 
 class Base(DeclarativeBase):
     pass
+
+
+def utc_now() -> datetime:
+    """Current UTC time as stored by the DATETIME columns (naive, whole seconds)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+class current_timestamp_on_update(FunctionElement):
+    """Server default of ``updated_at`` columns.
+
+    MySQL also refreshes the column on every UPDATE of the row; other
+    databases (SQLite for the in-process load test) only get the default.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(current_timestamp_on_update)
+def _compile_current_timestamp(element, compiler, **kw) -> str:
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(current_timestamp_on_update, "mysql")
+def _compile_current_timestamp_on_update(element, compiler, **kw) -> str:
+    return "CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
@@ -1,9 +1,9 @@
-from datetime import datetime, timezone
+from datetime import datetime
 
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, DateTime, Integer, Boolean, text
+from sqlalchemy import String, DateTime, Integer, Boolean, Index, text
 
-from src.db.models import Base
+from src.db.models import Base, current_timestamp_on_update, utc_now
 
 
 class Task(Base):
@@ -15,16 +15,18 @@ class Task(Base):
     description: Mapped[str] = mapped_column(String(255), nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
-        default=datetime.now(timezone.utc),
+        default=utc_now,
         server_default=text("CURRENT_TIMESTAMP"),
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
-        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        default=utc_now,
+        onupdate=utc_now,
+        server_default=current_timestamp_on_update(),
     )
     complete: Mapped[bool] = mapped_column(Boolean, default=False)
 
+    __table_args__ = (Index("idx_task_user_id", "user_id", "id"),)
+
     def __repr__(self) -> str:
         return f"<Task(id={self.id}, title={self.title}, user_id={self.user_id})>"
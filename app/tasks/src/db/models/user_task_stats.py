@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, Integer, text
+
+from src.db.models import Base, current_timestamp_on_update, utc_now
+
+
+class UserTaskStats(Base):
+    """Task counts of a user, kept up to date by TaskRepository writes"""
+
+    __tablename__ = "user_task_stats"
+
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    open_tasks: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+    completed_tasks: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=utc_now,
+        onupdate=utc_now,
+        server_default=current_timestamp_on_update(),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<UserTaskStats(user_id={self.user_id}, open_tasks={self.open_tasks}, "
+            f"completed_tasks={self.completed_tasks})>"
+        )
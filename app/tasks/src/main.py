@@ -1,28 +1,67 @@
-from fastapi import FastAPI
+import math
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from src.api.tasks import router as tasks
 from src.api.health import router as health
+from src.api.metrics import router as metrics
 
 from src.db.engine import engine, read_engine
+from src.db.resilience import DatabaseUnavailableError
 
-from src.core.logging import setup_logging
+from src.core.config import settings
+from src.core.cache import start_cache, close_cache
+from src.core.health import start_health_prober, close_health_prober
+from src.core.context import RequestIdMiddleware
+from src.core.logging import setup_logging, shutdown_logging
+from src.core.request_metrics import MetricsMiddleware
+from src.core.tracing import (
+    TracingMiddleware,
+    shutdown_tracing,
+    start_tracing,
+    tracing_enabled,
+)
 
 setup_logging()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    start_tracing()
+    await start_cache()
+    await start_health_prober()
+
     yield
 
+    await close_health_prober()
+    await close_cache()
     await engine.dispose()
     await read_engine.dispose()
+    shutdown_tracing()
+    shutdown_logging()
 
 
 app = FastAPI(title="Tasks Service", root_path="/tasks", lifespan=lifespan)
 
 app.include_router(tasks)
+app.add_middleware(MetricsMiddleware)
+if tracing_enabled():
+    app.add_middleware(TracingMiddleware)
+app.add_middleware(RequestIdMiddleware)
+
 app.include_router(health)
+app.include_router(metrics)
+
+
+@app.exception_handler(DatabaseUnavailableError)
+async def database_unavailable(request: Request, exc: DatabaseUnavailableError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database unavailable"},
+        headers={"Retry-After": str(math.ceil(settings.DB_CIRCUIT_RESET_SECONDS))},
+    )
 
 
 @app.get("/")
@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 
 class TaskBase(BaseModel):
@@ -29,3 +29,21 @@ class TaskResponse(TaskBase):
     complete: bool
 
     model_config = ConfigDict(from_attributes=True)
+
+
+TaskResponseList = TypeAdapter(List[TaskResponse])
+
+
+class TaskBatchResponse(BaseModel):
+    tasks: Dict[int, TaskResponse]
+    missing: List[int]
+
+
+TaskBatch = TypeAdapter(TaskBatchResponse)
+
+
+class TaskStatsResponse(BaseModel):
+    user_id: int
+    open: int
+    completed: int
+    total: int
@@ -1,12 +1,64 @@
-from typing import Optional, Sequence
+from collections import Counter
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import Row, Select, case, func, select, insert, update, delete
+from sqlalchemy.dialects import mysql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.db.models import Task
-from src.schemas.tasks import TaskCreate, TaskUpdate
+from src.core.cache import create_cache
+from src.core.config import settings
+from src.core.context import tag_repository
+from src.core.singleflight import create_single_flight
+from src.db.models import Task, UserTaskStats, utc_now
+from src.db.resilience import retry_read
+from src.schemas.tasks import TaskCreate, TaskResponse, TaskUpdate
 
+task_cache = create_cache("tasks", TaskResponse)
+task_flight = create_single_flight("tasks")
+user_tasks_flight = create_single_flight("tasks_per_user")
 
+# Reads select the TaskResponse columns as plain rows, skipping ORM entity
+# hydration and the identity map; rows expose the columns as attributes
+TASK_COLUMNS = (
+    Task.id,
+    Task.user_id,
+    Task.title,
+    Task.description,
+    Task.created_at,
+    Task.updated_at,
+    Task.complete,
+)
+
+
+def _upsert_stats(dialect: str, rows: List[Dict], absolute: bool):
+    """INSERT the stats rows, adding to (or replacing) the counts of existing ones.
+
+    Uses ON DUPLICATE KEY UPDATE on MySQL and ON CONFLICT elsewhere (SQLite).
+    """
+    if dialect == "mysql":
+        statement = mysql.insert(UserTaskStats).values(rows)
+        new = statement.inserted
+    else:
+        statement = sqlite.insert(UserTaskStats).values(rows)
+        new = statement.excluded
+
+    if absolute:
+        counts = {"open_tasks": new.open_tasks, "completed_tasks": new.completed_tasks}
+    else:
+        counts = {
+            "open_tasks": UserTaskStats.open_tasks + new.open_tasks,
+            "completed_tasks": UserTaskStats.completed_tasks + new.completed_tasks,
+        }
+    counts["updated_at"] = new.updated_at
+
+    if dialect == "mysql":
+        return statement.on_duplicate_key_update(**counts)
+    return statement.on_conflict_do_update(
+        index_elements=[UserTaskStats.user_id], set_=counts
+    )
+
+
+@tag_repository
 class TaskRepository:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
@@ -18,36 +70,308 @@ class TaskRepository:
             description=task_data.description,
         )
 
+        # Defaults are generated by the application, so the INSERT is all it takes
         self.session.add(task)
         await self.session.flush()
-        await self.session.refresh(task)
+        await self._count_tasks([(task.user_id, False, 1)])
 
         return task
 
-    async def get_task_by_id(self, id: int) -> Optional[Task]:
-        result = await self.session.execute(select(Task).where(Task.id == id))
-        return result.scalar_one_or_none()
+    async def create_tasks(
+        self, tasks_data: Sequence[TaskCreate]
+    ) -> List[TaskResponse]:
+        """Insert tasks with multi-row INSERTs of DB_BULK_INSERT_CHUNK_SIZE rows.
+
+        Defaults are set here so no row has to be read back. IDs come from
+        RETURNING where supported; on MySQL LAST_INSERT_ID() is the first of the
+        consecutive IDs InnoDB reserves for a multi-row INSERT of known size.
+        """
+        now = utc_now()
+        rows = [
+            {
+                "user_id": task.user_id,
+                "title": task.title,
+                "description": task.description,
+                "complete": False,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for task in tasks_data
+        ]
+
+        table = Task.__table__
+        returning = self.session.bind.dialect.insert_executemany_returning
+        chunk_size = settings.DB_BULK_INSERT_CHUNK_SIZE
+
+        created: List[TaskResponse] = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start : start + chunk_size]
+
+            if returning:
+                result = await self.session.execute(
+                    insert(table).returning(table.c.id, sort_by_parameter_order=True),
+                    chunk,
+                )
+                ids = list(result.scalars())
+            else:
+                result = await self.session.execute(insert(table).values(chunk))
+                first_id = result.lastrowid  # type: ignore[attr-defined]
+                ids = list(range(first_id, first_id + len(chunk)))
+
+            created.extend(
+                TaskResponse.model_construct(id=id, **row)
+                for id, row in zip(ids, chunk)
+            )
+
+        await self._count_tasks((task.user_id, False, 1) for task in tasks_data)
+        return created
+
+    @retry_read
+    async def get_task_by_id(self, id: int) -> Optional[TaskResponse]:
+        """Return a task.
+
+        Reads from the replica are served from the cache, and concurrent misses
+        for the same task share a single query.
+        """
+        if not self._on_replica():
+            return await self._select_task(id)
+
+        if (cached := await task_cache.get(id)) is not None:
+            return cached
+
+        return await task_flight.do(id, lambda: self._select_and_cache_task(id))
+
+    @retry_read
+    async def get_tasks_by_ids(self, ids: Sequence[int]) -> Dict[int, Row]:
+        """Return the tasks with the given IDs keyed by ID, without the missing ones.
+
+        Runs one IN query per DB_IN_CHUNK_SIZE IDs, so a page of references is
+        a single statement.
+        """
+        tasks: Dict[int, Row] = {}
+        chunk_size = settings.DB_IN_CHUNK_SIZE
+        for start in range(0, len(ids), chunk_size):
+            result = await self.session.execute(
+                select(*TASK_COLUMNS).where(
+                    Task.id.in_(ids[start : start + chunk_size])
+                )
+            )
+            tasks.update((task.id, task) for task in result)
+        return tasks
+
+    @retry_read
+    async def get_tasks_per_user(
+        self, user_id: int, limit: int, after: Optional[int] = None
+    ) -> Optional[Sequence[Row]]:
+        """Return up to ``limit`` tasks of a user ordered by ID, after the cursor.
+
+        Concurrent identical reads from the replica share a single query.
+        """
+        if not self._on_replica():
+            return await self._select_tasks_per_user(user_id, limit, after)
+
+        return await user_tasks_flight.do(
+            (user_id, limit, after),
+            lambda: self._select_tasks_per_user(user_id, limit, after),
+        )
+
+    async def stream_tasks_per_user(
+        self, user_id: int, after: Optional[int] = None
+    ) -> AsyncIterator[Row]:
+        """Yield every task of a user through a server-side cursor"""
+        query = self._tasks_per_user_query(user_id, after).execution_options(
+            yield_per=settings.DB_STREAM_BATCH_SIZE
+        )
+        result = await self.session.stream(query)
+
+        async for task in result:
+            yield task
 
-    async def get_tasks_per_user(self, user_id: int) -> Optional[Sequence[Task]]:
-        result = await self.session.execute(select(Task).where(Task.user_id == user_id))
+    def _on_replica(self) -> bool:
+        # Reads from the writer must see the client's own writes, which a
+        # cached or in-flight result may predate, so they always hit the table
+        return self.session.info.get("read_only", False)
 
-        tasks = result.scalars().all()
+    async def _select_task(self, id: int) -> Optional[TaskResponse]:
+        result = await self.session.execute(select(*TASK_COLUMNS).where(Task.id == id))
+        task = result.one_or_none()
+        return TaskResponse.model_validate(task) if task else None
+
+    async def _select_and_cache_task(self, id: int) -> Optional[TaskResponse]:
+        response = await self._select_task(id)
+        if response is not None:
+            await task_cache.set(id, response)
+        return response
+
+    async def _select_tasks_per_user(
+        self, user_id: int, limit: int, after: Optional[int]
+    ) -> Optional[Sequence[Row]]:
+        query = self._tasks_per_user_query(user_id, after).limit(limit)
+        result = await self.session.execute(query)
+
+        tasks = result.all()
         return tasks if tasks else None
 
+    @staticmethod
+    def _tasks_per_user_query(user_id: int, after: Optional[int]) -> Select:
+        query = select(*TASK_COLUMNS).where(Task.user_id == user_id)
+        if after is not None:
+            query = query.where(Task.id > after)
+        return query.order_by(Task.id)
+
     async def update_task(
         self, task_id: int, task_update: TaskUpdate
-    ) -> Optional[Task]:
+    ) -> Optional[TaskResponse]:
+        """Update a task and return its new state, or None when it does not exist.
+
+        Databases supporting UPDATE ... RETURNING do it in one statement. On
+        MySQL the new state is built from the locked row when there is one,
+        otherwise not-found comes from the UPDATE row count and only then is
+        the row read.
+        """
         update_data = task_update.model_dump(exclude_unset=True)
 
         if not update_data:
             return await self.get_task_by_id(task_id)
 
-        await self.session.execute(
-            update(Task).where(Task.id == task_id).values(**update_data)
-        )
-        await self.session.flush()
-        return await self.get_task_by_id(task_id)
+        # Moving a task between users or states moves it between counts, so
+        # lock the row and read what it was before
+        before = None
+        if "user_id" in update_data or "complete" in update_data:
+            before = await self._lock_task(task_id)
+            if before is None:
+                return None
+
+        # Set here rather than by the column's onupdate, to know its new value
+        update_data["updated_at"] = utc_now()
+        statement = update(Task).where(Task.id == task_id).values(**update_data)
+
+        if self.session.bind.dialect.update_returning:
+            result = await self.session.execute(statement.returning(*TASK_COLUMNS))
+            task = result.one_or_none()
+        elif before is not None:
+            await self.session.execute(statement)
+            task = TaskResponse.model_validate({**before._mapping, **update_data})
+        else:
+            result = await self.session.execute(statement)
+            task = None
+            if result.rowcount > 0:  # type: ignore[attr-defined]
+                result = await self.session.execute(
+                    select(*TASK_COLUMNS).where(Task.id == task_id)
+                )
+                task = result.one()
+
+        if before is not None and task is not None:
+            await self._count_tasks(
+                [
+                    (before.user_id, before.complete, -1),
+                    (task.user_id, task.complete, 1),
+                ]
+            )
+
+        task_cache.delete_after_commit(self.session, task_id)
+        return TaskResponse.model_validate(task) if task else None
 
     async def delete_task(self, task_id: int) -> bool:
-        result = await self.session.execute(delete(Task).where(Task.id == task_id))
-        return result.rowcount > 0  # type: ignore[attr-defined]
+        task = await self._lock_task(task_id)
+        if task is None:
+            return False
+
+        await self.session.execute(delete(Task).where(Task.id == task_id))
+        await self._count_tasks([(task.user_id, task.complete, -1)])
+        task_cache.delete_after_commit(self.session, task_id)
+        return True
+
+    @retry_read
+    async def get_user_task_stats(self, user_id: int) -> Optional[Row]:
+        """Return the task counts of a user, a primary key lookup"""
+        result = await self.session.execute(
+            select(
+                UserTaskStats.user_id,
+                UserTaskStats.open_tasks,
+                UserTaskStats.completed_tasks,
+            ).where(UserTaskStats.user_id == user_id)
+        )
+        return result.one_or_none()
+
+    async def reconcile_user_task_stats(
+        self, first_user_id: int, last_user_id: int
+    ) -> int:
+        """Recount the tasks of the users in a range of IDs, fixing their stats.
+
+        The stats rows of the range are locked before the tasks are counted, so
+        writes racing with the recount either commit first and are counted, or
+        wait and apply their change on top of it. Returns how many users had
+        wrong counts.
+        """
+        in_range = UserTaskStats.user_id.between(first_user_id, last_user_id)
+        result = await self.session.execute(
+            select(
+                UserTaskStats.user_id,
+                UserTaskStats.open_tasks,
+                UserTaskStats.completed_tasks,
+            )
+            .where(in_range)
+            .with_for_update()
+        )
+        stored = {row.user_id: (row.open_tasks, row.completed_tasks) for row in result}
+
+        result = await self.session.execute(
+            select(
+                Task.user_id,
+                func.count(case((Task.complete.is_(False), 1))),
+                func.count(case((Task.complete.is_(True), 1))),
+            )
+            .where(Task.user_id.between(first_user_id, last_user_id))
+            .group_by(Task.user_id)
+        )
+        counted = {user_id: (open, completed) for user_id, open, completed in result}
+
+        now = utc_now()
+        rows = [
+            {
+                "user_id": user_id,
+                "open_tasks": counts[0],
+                "completed_tasks": counts[1],
+                "updated_at": now,
+            }
+            for user_id in sorted(stored.keys() | counted.keys())
+            if (counts := counted.get(user_id, (0, 0))) != stored.get(user_id)
+        ]
+        if rows:
+            dialect = self.session.bind.dialect.name
+            await self.session.execute(_upsert_stats(dialect, rows, absolute=True))
+        return len(rows)
+
+    async def _lock_task(self, task_id: int) -> Optional[Row]:
+        """Lock a task's row until the transaction ends and return its columns"""
+        result = await self.session.execute(
+            select(*TASK_COLUMNS).where(Task.id == task_id).with_for_update()
+        )
+        return result.one_or_none()
+
+    async def _count_tasks(self, changes: Iterable[Tuple[int, bool, int]]) -> None:
+        """Add each (user_id, complete, delta) to the user's open or completed count.
+
+        Users are updated in ID order, so concurrent writes touching the same
+        users lock their stats rows in the same order and cannot deadlock.
+        """
+        open_tasks: Counter = Counter()
+        completed_tasks: Counter = Counter()
+        for user_id, complete, delta in changes:
+            (completed_tasks if complete else open_tasks)[user_id] += delta
+
+        now = utc_now()
+        rows = [
+            {
+                "user_id": user_id,
+                "open_tasks": open_tasks[user_id],
+                "completed_tasks": completed_tasks[user_id],
+                "updated_at": now,
+            }
+            for user_id in sorted(open_tasks.keys() | completed_tasks.keys())
+            if open_tasks[user_id] or completed_tasks[user_id]
+        ]
+        if rows:
+            dialect = self.session.bind.dialect.name
+            await self.session.execute(_upsert_stats(dialect, rows, absolute=False))
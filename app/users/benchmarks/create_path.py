@@ -0,0 +1,79 @@
+"""Latency of the user create path with and without the post-insert refresh.
+
+Creates users through UserRepository.create_user, which issues only the
+INSERT, and through the previous flush + refresh sequence (INSERT + SELECT).
+Every create runs in its own transaction against the configured database, as
+the endpoint does, and is rolled back to leave the table untouched.
+
+    uv run python -m benchmarks.create_path [--iterations N]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import List
+
+from src.db.engine import engine
+from src.db.models import User
+from src.db.session import AsyncSessionLocal
+from src.schemas.users import UserBase
+from src.services.user_repository import UserRepository
+
+from benchmarks.common import report
+
+HASHED_PASSWORD = "0" * 64
+
+
+def new_user() -> UserBase:
+    return UserBase(
+        email=f"bench-{uuid.uuid4().hex}@example.com", name="Bench", lastname="Mark"
+    )
+
+
+async def create_with_refresh() -> None:
+    async with AsyncSessionLocal() as session:
+        user_data = new_user()
+        user = User(
+            email=user_data.email,
+            name=user_data.name,
+            lastname=user_data.lastname,
+            hashed_password=HASHED_PASSWORD,
+        )
+        session.add(user)
+        await session.flush()
+        await session.refresh(user)
+        await session.rollback()
+
+
+async def create_without_refresh() -> None:
+    async with AsyncSessionLocal() as session:
+        await UserRepository(session).create_user(new_user(), HASHED_PASSWORD)
+        await session.rollback()
+
+
+async def measure(create, iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await create()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def main(iterations: int) -> None:
+    # Warm up the pool so connection setup is not measured
+    await measure(create_without_refresh, 20)
+
+    report("flush + refresh (before)", await measure(create_with_refresh, iterations))
+    report("flush only (after)", await measure(create_without_refresh, iterations))
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.iterations))
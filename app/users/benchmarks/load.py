@@ -0,0 +1,62 @@
+"""Load test of the user CRUD endpoints.
+
+Each iteration of a worker creates a user with a unique email, logs in,
+reads it, renames it and deletes it, so the table ends as it started. Create
+and login hash passwords, so they measure the hashing pool as well. See
+``benchmarks.loadgen`` for the options and the baseline comparison.
+
+    uv run python -m benchmarks.load [--url http://localhost:8001/users | --sqlite FILE]
+        [--concurrency N] [--duration S] [--save FILE | --compare FILE]
+"""
+
+import uuid
+
+import httpx
+
+from benchmarks.loadgen import Recorder, main
+
+PASSWORD = "bench1234"
+
+
+async def scenario(client: httpx.AsyncClient, recorder: Recorder, worker: int) -> None:
+    email = f"bench-{uuid.uuid4().hex}@example.com"
+
+    response = await recorder.request(
+        client,
+        "POST /users/",
+        "POST",
+        "/users/",
+        expected=(201,),
+        json={
+            "email": email,
+            "name": "Bench",
+            "lastname": "Load",
+            "password": PASSWORD,
+        },
+    )
+    if response is None or response.status_code != 201:
+        return
+    user_id = response.json()["id"]
+
+    await recorder.request(
+        client,
+        "POST /users/login",
+        "POST",
+        "/users/login",
+        json={"email": email, "password": PASSWORD},
+    )
+    await recorder.request(client, "GET /users/{user_id}", "GET", f"/users/{user_id}")
+    await recorder.request(
+        client,
+        "PUT /users/{user_id}",
+        "PUT",
+        f"/users/{user_id}",
+        json={"name": f"Bench{worker}"},
+    )
+    await recorder.request(
+        client, "DELETE /users/{user_id}", "DELETE", f"/users/{user_id}"
+    )
+
+
+if __name__ == "__main__":
+    main(scenario, __doc__.splitlines()[0], "/users")
@@ -0,0 +1,137 @@
+"""Latency of keyset versus OFFSET pagination of the user listing, by page depth.
+
+Seeds ``--rows`` active users (one million by default) in committed chunks,
+unless that many benchmark users already exist, then reads a page of
+``--limit`` users at increasing depths: through LIMIT ... OFFSET and through
+the (created_at, id) cursor UserRepository.list_users takes. OFFSET has to
+walk every skipped index entry, so it slows down linearly with the depth;
+the keyset read costs the same on every page. ``--cleanup`` deletes the
+benchmark users afterwards.
+
+    uv run python -m benchmarks.pagination [--rows N] [--limit N] [--cleanup]
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import timedelta
+from typing import List, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.engine import engine
+from src.db.models import User, utc_now
+from src.db.session import AsyncSessionLocal
+from src.services.user_repository import USER_COLUMNS, UserRepository
+
+from benchmarks.common import report
+
+EMAIL_DOMAIN = "pagination.bench"
+CHUNK_SIZE = 10_000
+
+
+async def seed(rows: int) -> None:
+    async with AsyncSessionLocal() as session:
+        existing = await session.scalar(
+            select(func.count()).where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+        )
+    if existing >= rows:
+        print(f"Reusing {existing} benchmark users")
+        return
+
+    # Older than any real user, one per second, so they come first in the listing
+    start = utc_now() - timedelta(days=3650) - timedelta(seconds=rows)
+    for offset in range(existing, rows, CHUNK_SIZE):
+        values = [
+            {
+                "email": f"user{i}@{EMAIL_DOMAIN}",
+                "name": "Bench",
+                "lastname": "Pagination",
+                "hashed_password": "-",
+                "is_active": True,
+                "created_at": start + timedelta(seconds=i),
+                "updated_at": start + timedelta(seconds=i),
+            }
+            for i in range(offset, min(offset + CHUNK_SIZE, rows))
+        ]
+        async with AsyncSessionLocal() as session:
+            await session.execute(insert(User), values)
+            await session.commit()
+        print(f"Seeded {offset + len(values)}/{rows} users", end="\r")
+    print()
+
+
+async def read_offset(session: AsyncSession, depth: int, limit: int) -> None:
+    await session.execute(
+        select(*USER_COLUMNS)
+        .where(User.is_active.is_(True))
+        .order_by(User.created_at, User.id)
+        .offset(depth)
+        .limit(limit)
+    )
+
+
+async def cursor_at(session: AsyncSession, depth: int) -> Tuple:
+    """(created_at, id) of the user just before ``depth``, as a page cursor"""
+    result = await session.execute(
+        select(User.created_at, User.id)
+        .where(User.is_active.is_(True))
+        .order_by(User.created_at, User.id)
+        .offset(depth - 1)
+        .limit(1)
+    )
+    return tuple(result.one())
+
+
+async def measure(read, iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await read()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def main(rows: int, limit: int, iterations: int, cleanup: bool) -> None:
+    await seed(rows)
+
+    depths = [0] + [
+        depth
+        for depth in (1_000, 10_000, 100_000, rows // 2, rows - limit)
+        if 0 < depth < rows
+    ]
+
+    async with AsyncSessionLocal() as session:
+        repo = UserRepository(session)
+        for depth in depths:
+            cursor = await cursor_at(session, depth) if depth else None
+
+            report(
+                f"offset {depth}",
+                await measure(lambda: read_offset(session, depth, limit), iterations),
+            )
+            report(
+                f"keyset {depth}",
+                await measure(lambda: repo.list_users(True, limit, cursor), iterations),
+            )
+
+    if cleanup:
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+            )
+            await session.commit()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.limit, args.iterations, args.cleanup))
@@ -0,0 +1,91 @@
+"""Throughput of the user create path with scrypt on and off the event loop.
+
+Runs ``--concurrency`` concurrent creates, each hashing the password and
+inserting the user in its own rolled back transaction, with the hash computed
+inline on the event loop and in the password worker pool. Besides create
+latency and throughput, a ticker task measures how late the event loop runs
+it, which is what every other request of the worker would wait.
+
+    uv run python -m benchmarks.password [--requests N] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Awaitable, Callable, List
+
+from src.db.engine import engine
+from src.db.session import AsyncSessionLocal
+from src.helpers.password import hash_password, hash_password_sync, shutdown_hasher
+from src.schemas.users import UserBase
+from src.services.user_repository import UserRepository
+
+from benchmarks.common import report
+
+PASSWORD = "pass1234*"
+TICK = 0.005
+
+Hash = Callable[[str], Awaitable[str]]
+
+
+async def hash_inline(password: str) -> str:
+    return hash_password_sync(password)
+
+
+async def create(hash: Hash) -> None:
+    async with AsyncSessionLocal() as session:
+        user = UserBase(
+            email=f"bench-{uuid.uuid4().hex}@example.com", name="Bench", lastname="Mark"
+        )
+        await UserRepository(session).create_user(user, await hash(PASSWORD))
+        await session.rollback()
+
+
+async def ticker(lags: List[float]) -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def run(name: str, hash: Hash, requests: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+    lags: List[float] = []
+
+    async def timed_create() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await create(hash)
+            samples.append(time.perf_counter() - start)
+
+    lag_task = asyncio.create_task(ticker(lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(timed_create() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    lag_task.cancel()
+
+    report(f"{name} create", samples)
+    report(f"{name} loop lag", lags)
+    print(f"{'':<28} throughput {requests / elapsed:8.1f} creates/s")
+
+
+async def main(requests: int, concurrency: int) -> None:
+    # Warm up the pools so connection and thread setup are not measured
+    await asyncio.gather(*(create(hash_password) for _ in range(concurrency)))
+
+    await run("inline (before)", hash_inline, requests, concurrency)
+    await run("worker pool (after)", hash_password, requests, concurrency)
+
+    shutdown_hasher()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,157 @@
+"""In-memory server speaking enough of the Redis protocol for the shared cache.
+
+Lets the Redis cache backend, including invalidations broadcast between
+replicas, run locally and in tests without a Redis server::
+
+    async with FakeRedisServer() as server:
+        backend = RedisCacheBackend(server.url, channel="invalidations", timeout=1)
+
+or, for services started with ``CACHE_BACKEND=redis``::
+
+    uv run python -m scripts.fake_redis [--port 6379]
+
+Supports PING, AUTH, SELECT, GET, SET (with EX/PX and NX), DEL, FLUSHALL,
+PUBLISH and SUBSCRIBE. Development only: it is not part of the service image.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.core.redis import RedisError, read_reply
+
+
+def encode_reply(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RedisError):
+        return b"-%s\r\n" % str(value).encode()
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode_reply(v) for v in value)
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+class FakeRedisServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.host = host
+        self.port = port
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.subscribers: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+        self._server: Optional[asyncio.Server] = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writers in self.subscribers.values():
+                for writer in writers:
+                    writer.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "FakeRedisServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                command = await read_reply(reader)
+                writer.write(encode_reply(self._execute(command, writer)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for writers in self.subscribers.values():
+                writers.discard(writer)
+            writer.close()
+
+    def _execute(self, command: List[bytes], writer: asyncio.StreamWriter) -> Any:
+        name, args = command[0].upper(), command[1:]
+
+        if name == b"PING":
+            return "PONG"
+        if name in (b"AUTH", b"SELECT"):
+            return "OK"
+        if name == b"GET":
+            return self._get(args[0])
+        if name == b"SET":
+            return self._set(args)
+        if name == b"DEL":
+            return sum(self.data.pop(key, None) is not None for key in args)
+        if name == b"FLUSHALL":
+            self.data.clear()
+            return "OK"
+        if name == b"PUBLISH":
+            return self._publish(args[0], args[1])
+        if name == b"SUBSCRIBE":
+            self.subscribers.setdefault(args[0], set()).add(writer)
+            return [b"subscribe", args[0], 1]
+
+        return RedisError(f"ERR unknown command '{name.decode()}'")
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def _set(self, args: List[bytes]) -> Optional[str]:
+        key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+        if b"NX" in options and self._get(key) is not None:
+            return None
+
+        expires_at = None
+        if b"EX" in options:
+            expires_at = time.monotonic() + int(args[2 + options.index(b"EX") + 1])
+        elif b"PX" in options:
+            expires_at = (
+                time.monotonic() + int(args[2 + options.index(b"PX") + 1]) / 1000
+            )
+
+        self.data[key] = (value, expires_at)
+        return "OK"
+
+    def _publish(self, channel: bytes, message: bytes) -> int:
+        writers = self.subscribers.get(channel, set())
+        for subscriber in writers:
+            subscriber.write(encode_reply([b"message", channel, message]))
+        return len(writers)
+
+
+async def serve(host: str, port: int) -> None:
+    async with FakeRedisServer(host, port) as server:
+        print(f"Serving {server.url}")
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port))
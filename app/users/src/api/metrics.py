@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+
+from src.core.metrics import CONTENT_TYPE, REGISTRY
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics")
+async def metrics() -> Response:
+    """Metrics of this worker in the Prometheus text format"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,17 +1,39 @@
+import base64
 import logging
 
-from typing import Annotated
-from fastapi import APIRouter, Depends, Path, HTTPException, status
+from datetime import datetime
+from typing import Annotated, List, Optional, Tuple, Union
+from fastapi import APIRouter, Depends, Path, HTTPException, Query, Response, status
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.helpers.password import hash_password
+from src.helpers.password import (
+    DUMMY_HASH,
+    hash_password,
+    needs_rehash,
+    verify_password,
+)
 
-from src.schemas.users import UserCreate, UserResponse, UserBase, UserUpdate
-from src.core.dependencies import get_db
-from src.services.user_repository import UserRepository
+from src.schemas.users import (
+    UserBatch,
+    UserBatchResponse,
+    UserCreate,
+    UserLogin,
+    UserResponse,
+    UserResponseList,
+    UserBase,
+    UserUpdate,
+)
+from src.core.config import settings
+from src.core.dependencies import get_db, get_read_db
+from src.core.responses import ModelResponse
+from src.services.user_repository import DuplicateEmailError, UserRepository
 
 logger = logging.getLogger(__name__)
 
+# Comma-separated positive IDs, e.g. 1,2,3
+IDS_PATTERN = r"^[1-9][0-9]{0,9}(,[1-9][0-9]{0,9})*$"
+
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -24,29 +46,151 @@ router = APIRouter(prefix="/users", tags=["Users"])
     response_model=UserResponse,
 )
 async def create_user(
-    user: UserCreate, db: AsyncSession = Depends(get_db)
+    user: UserCreate, db: AsyncSession = Depends(get_db, scope="function")
 ) -> UserResponse:
     logger.info("Creating user")
     repo = UserRepository(db)
 
-    if await repo.exists(user.email):
+    user_data = UserBase(email=user.email, name=user.name, lastname=user.lastname)
+    hashed_password = await hash_password(user.password)
+
+    try:
+        response = await repo.create_user(user_data, hashed_password)
+    except DuplicateEmailError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
 
-    user_data = UserBase(email=user.email, name=user.name, lastname=user.lastname)
-    hashed_password = hash_password(user.password)
-    response = await repo.create_user(user_data, hashed_password)
+    return UserResponse.model_validate(response)
+
+
+@router.post(
+    "/login",
+    status_code=status.HTTP_200_OK,
+    description="Check the password of a user",
+    response_description="User authenticated successfully",
+    response_model=UserResponse,
+)
+async def login(
+    credentials: UserLogin, db: AsyncSession = Depends(get_db, scope="function")
+) -> UserResponse:
+    logger.info("Authenticating user")
+    repo = UserRepository(db)
+
+    user = await repo.get_credentials(credentials.email)
+    # Unknown emails are checked against a dummy hash to take as long
+    hashed_password = user.hashed_password if user else DUMMY_HASH
+    verified = await verify_password(credentials.password, hashed_password)
+
+    if user is None or not verified:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password",
+        )
+
+    if needs_rehash(hashed_password):
+        logger.info("Upgrading password hash")
+        await repo.update_password(user.id, await hash_password(credentials.password))
+
+    return UserResponse.model_validate(user)
+
+
+@router.get(
+    "/",
+    status_code=status.HTTP_200_OK,
+    description=(
+        "List users with the given `is_active` flag in creation order, paginated "
+        "by keyset: pass the X-Next-Cursor header value as `after` to fetch the "
+        "next page. With `ids`, retrieve those users instead, keyed by ID, with "
+        "the IDs without a user listed in `missing`"
+    ),
+    response_description="Users retrieved successfully",
+    response_model=Union[List[UserResponse], UserBatchResponse],
+    responses={
+        200: {
+            "headers": {
+                "X-Next-Cursor": {
+                    "description": "Cursor of the next page, absent on the last page",
+                    "schema": {"type": "string"},
+                }
+            },
+        },
+    },
+)
+async def get_users(
+    ids: Annotated[
+        Optional[str],
+        Query(
+            description="Comma-separated user IDs; the other parameters are ignored",
+            pattern=IDS_PATTERN,
+        ),
+    ] = None,
+    is_active: Annotated[
+        bool, Query(description="List active or inactive users")
+    ] = True,
+    limit: Annotated[
+        int,
+        Query(
+            description="Maximum number of users to return",
+            ge=1,
+            le=settings.USERS_MAX_PAGE_SIZE,
+        ),
+    ] = settings.USERS_PAGE_SIZE,
+    after: Annotated[
+        Optional[str],
+        Query(description="Return only users after this cursor"),
+    ] = None,
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    repo = UserRepository(db)
+
+    if ids is not None:
+        return await _get_users_by_ids(repo, ids)
+
+    logger.info("Listing users")
+
+    cursor = _decode_cursor(after) if after is not None else None
+    users = await repo.list_users(is_active, limit + 1, cursor)
+
+    headers = {}
+    if len(users) > limit:
+        users = users[:limit]
+        headers["X-Next-Cursor"] = _encode_cursor(users[-1])
+
+    return ModelResponse(users, UserResponseList, headers=headers)
+
+
+async def _get_users_by_ids(repo: UserRepository, ids: str) -> Response:
+    user_ids = list(dict.fromkeys(int(id) for id in ids.split(",")))
+    if len(user_ids) > settings.USERS_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.USERS_BATCH_MAX_IDS} IDs per request",
+        )
+
+    logger.info("Retrieving %d users", len(user_ids))
+
+    users = await repo.get_users_by_ids(user_ids)
 
-    return UserResponse(
-        id=response.id,
-        email=response.email,
-        name=response.name,
-        lastname=response.lastname,
-        created_at=response.created_at,
-        updated_at=response.updated_at,
-        is_active=response.is_active,
-    )
+    missing = [id for id in user_ids if id not in users]
+    return ModelResponse({"users": users, "missing": missing}, UserBatch)
+
+
+def _encode_cursor(user: Row) -> str:
+    """Opaque cursor holding the (created_at, id) position of a user"""
+    position = f"{user.created_at.isoformat()}/{user.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = base64.urlsafe_b64decode(padded).decode().split("/")
+        return datetime.fromisoformat(created_at), int(id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
 
 
 @router.get(
@@ -58,7 +202,7 @@ async def create_user(
 )
 async def get_user(
     user_id: Annotated[int, Path(title="The ID of the user to get", gt=0)],
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> UserResponse:
     logger.info("Retrieving user")
 
@@ -70,15 +214,7 @@ async def get_user(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    return UserResponse(
-        id=response.id,
-        email=response.email,
-        name=response.name,
-        lastname=response.lastname,
-        created_at=response.created_at,
-        updated_at=response.updated_at,
-        is_active=response.is_active,
-    )
+    return UserResponse.model_validate(response)
 
 
 @router.put(
@@ -91,7 +227,7 @@ async def get_user(
 async def update_user(
     user_id: Annotated[int, Path(title="The ID of the user to update", gt=0)],
     user_data: UserUpdate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ) -> UserResponse:
     if not user_data.model_dump(exclude_unset=True):
         raise HTTPException(
@@ -99,34 +235,20 @@ async def update_user(
         )
 
     repo = UserRepository(db)
-    user = await repo.get_user_by_id(user_id)
-    if not user:
+
+    try:
+        response = await repo.update_user(user_id, user_data)
+    except DuplicateEmailError:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User does not exist"
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exist"
         )
 
-    if user_data.email and user_data.email != user.email:
-        if await repo.get_user_by_email(user_data.email):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exist"
-            )
-
-    response = await repo.update_user(user_id, user_data)
-
     if not response:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            status_code=status.HTTP_404_NOT_FOUND, detail="User does not exist"
         )
 
-    return UserResponse(
-        id=response.id,
-        email=response.email,
-        name=response.name,
-        lastname=response.lastname,
-        created_at=response.created_at,
-        updated_at=response.updated_at,
-        is_active=response.is_active,
-    )
+    return UserResponse.model_validate(response)
 
 
 @router.delete(
@@ -137,7 +259,7 @@ async def update_user(
 )
 async def delete_user(
     user_id: Annotated[int, Path(title="The ID of the user to delete", gt=0)],
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ) -> None:
     repo = UserRepository(db)
 
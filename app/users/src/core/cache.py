@@ -0,0 +1,294 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+M = TypeVar("M", bound=BaseModel)
+
+# Marks a key invalidated recently, which reads must not cache again yet
+_HELD = object()
+# Session.info key of the invalidations waiting for the transaction to commit
+PENDING_INVALIDATIONS = "cache_invalidations"
+
+cache_hits = Counter("cache_hits_total", "Reads served by a cache", ["cache", "tier"])
+cache_misses = Counter(
+    "cache_misses_total", "Reads a cache could not serve", ["cache", "tier"]
+)
+cache_evictions = Counter(
+    "cache_evictions_total",
+    "Entries evicted from the in-process cache to stay under CACHE_MAX_SIZE",
+    ["cache"],
+)
+cache_expirations = Counter(
+    "cache_expirations_total",
+    "Entries of the in-process cache found past their TTL",
+    ["cache"],
+)
+cache_errors = Counter(
+    "cache_errors_total",
+    "Operations on the shared cache backend that failed",
+    ["cache", "operation"],
+)
+cache_entries = Gauge(
+    "cache_entries", "Entries held by the in-process cache", ["cache"]
+)
+
+
+class TTLCache(Generic[V]):
+    """Bounded LRU cache whose entries also expire ``ttl`` seconds after being set.
+
+    ``delete`` can hold the key: until the hold ends, ``get`` misses and
+    ``set`` is ignored, so a read that raced with the write cannot cache the
+    old value again. Caches are per worker process and are only touched from
+    its event loop, so no locking is needed.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, Tuple[float, V]] = OrderedDict()
+
+        self._hits = cache_hits.labels(name, "local")
+        self._misses = cache_misses.labels(name, "local")
+        self._evictions = cache_evictions.labels(name)
+        self._expirations = cache_expirations.labels(name)
+        cache_entries.labels(name).set_function(lambda: len(self._entries))
+
+    def get(self, key: Hashable) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses.inc()
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            if value is not _HELD:
+                self._expirations.inc()
+            self._misses.inc()
+            return None
+        if value is _HELD:
+            self._misses.inc()
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits.inc()
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        if self.maxsize <= 0:
+            return
+
+        now = time.monotonic()
+        held = self._entries.get(key)
+        if held is not None and held[1] is _HELD and held[0] > now:
+            return
+
+        self._store(key, now + self.ttl, value)
+
+    def delete(self, key: Hashable, hold: float = 0) -> None:
+        """Drop the key, refusing to cache it again for ``hold`` seconds"""
+        if hold > 0 and self.maxsize > 0:
+            self._store(key, time.monotonic() + hold, _HELD)
+        else:
+            self._entries.pop(key, None)
+
+    def _store(self, key: Hashable, expires_at: float, value: object) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._evictions.inc()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class CacheBackend(ABC):
+    """Store shared by every replica of a service, behind the in-process caches.
+
+    ``delete`` must broadcast the invalidated key to the other replicas, which
+    receive it through the ``on_invalidate`` callback given to ``start``. For
+    ``hold`` seconds after it, ``get`` must miss (returning None or an empty
+    value) and ``set`` must not store the key.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str, hold: float) -> None: ...
+
+    async def start(
+        self, on_invalidate: Callable[[str], None], on_reset: Callable[[], None]
+    ) -> None:
+        """Start listening for invalidations; ``on_reset`` means some were missed"""
+
+    async def close(self) -> None:
+        pass
+
+
+class Cache(Generic[M]):
+    """Cache of one kind of record, keyed by ID.
+
+    Entries live in a per-worker TTLCache and, when a shared backend is
+    configured, in the backend as JSON so every replica can reuse them.
+    Without a backend, invalidations only reach the worker that wrote: the
+    others keep their entries at most DB_READ_STICKY_SECONDS, the time a
+    write takes to be guaranteed on the replica, so reads after the
+    read-your-writes window never see the old record.
+    """
+
+    def __init__(
+        self, name: str, model: Type[M], backend: Optional[CacheBackend] = None
+    ) -> None:
+        self.name = name
+        self.model = model
+        self.backend = backend
+
+        maxsize, ttl = settings.CACHE_MAX_SIZE, settings.CACHE_TTL_SECONDS
+        if backend is None:
+            ttl = min(ttl, settings.DB_READ_STICKY_SECONDS)
+            if ttl <= 0:
+                maxsize = 0
+        self.local: TTLCache[M] = TTLCache(name, maxsize, ttl)
+
+        self._shared_hits = cache_hits.labels(name, "shared")
+        self._shared_misses = cache_misses.labels(name, "shared")
+
+    def key(self, id: Hashable) -> str:
+        return f"{self.name}:{id}"
+
+    async def get(self, id: Hashable) -> Optional[M]:
+        key = self.key(id)
+        value = self.local.get(key)
+        if value is not None or self.backend is None:
+            return value
+
+        try:
+            raw = await self.backend.get(key)
+        except Exception as e:
+            self._backend_failed("get", e)
+            return None
+
+        if not raw:
+            self._shared_misses.inc()
+            return None
+
+        self._shared_hits.inc()
+        value = self.model.model_validate_json(raw)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, id: Hashable, value: M) -> None:
+        key = self.key(id)
+        self.local.set(key, value)
+        if self.backend is None:
+            return
+
+        try:
+            await self.backend.set(
+                key, value.model_dump_json().encode(), settings.CACHE_TTL_SECONDS
+            )
+        except Exception as e:
+            self._backend_failed("set", e)
+
+    def delete_after_commit(self, session: AsyncSession, id: Hashable) -> None:
+        """Invalidate ``id`` once the session's transaction commits.
+
+        Invalidating before the commit would let a read of the old row, from
+        the replica or a concurrent request, cache it again. ``get_db`` runs
+        the pending invalidations after committing.
+        """
+        session.info.setdefault(PENDING_INVALIDATIONS, []).append((self, id))
+
+    async def delete(self, id: Hashable) -> None:
+        """Drop ``id`` and hold it for DB_READ_STICKY_SECONDS.
+
+        Writes are only guaranteed to have reached the replica once the
+        read-your-writes window has passed; until then a replica read may
+        still return the old row, which must not be cached.
+        """
+        key = self.key(id)
+        self.local.delete(key, settings.DB_READ_STICKY_SECONDS)
+        if self.backend is None:
+            return
+
+        try:
+            await self.backend.delete(key, settings.DB_READ_STICKY_SECONDS)
+        except Exception as e:
+            self._backend_failed("delete", e)
+
+    def _backend_failed(self, operation: str, error: Exception) -> None:
+        # The database stays the source of truth: a failing backend only costs hits
+        cache_errors.labels(self.name, operation).inc()
+        logger.warning("Cache %s of %s failed: %s", operation, self.name, error)
+
+
+def create_backend() -> Optional[CacheBackend]:
+    if settings.CACHE_BACKEND == "redis":
+        from src.core.redis import RedisCacheBackend
+
+        return RedisCacheBackend(
+            settings.CACHE_REDIS_URL,
+            channel=settings.CACHE_INVALIDATION_CHANNEL,
+            timeout=settings.CACHE_REDIS_TIMEOUT,
+        )
+    return None
+
+
+backend = create_backend()
+caches: Dict[str, Cache] = {}
+
+
+def create_cache(name: str, model: Type[M]) -> Cache[M]:
+    """Create a cache on the configured backend and register it for invalidations"""
+    cache = Cache(name, model, backend)
+    caches[name] = cache
+    return cache
+
+
+async def invalidate_committed(session: AsyncSession) -> None:
+    """Run the invalidations of the writes the session just committed"""
+    for cache, id in session.info.pop(PENDING_INVALIDATIONS, ()):
+        await cache.delete(id)
+
+
+def discard_invalidations(session: AsyncSession) -> None:
+    """Forget the invalidations of a rolled back transaction"""
+    session.info.pop(PENDING_INVALIDATIONS, None)
+
+
+def _invalidate_local(key: str) -> None:
+    name, _, _ = key.partition(":")
+    if cache := caches.get(name):
+        cache.local.delete(key, settings.DB_READ_STICKY_SECONDS)
+
+
+def _reset_local() -> None:
+    for cache in caches.values():
+        cache.local.clear()
+
+
+async def start_cache() -> None:
+    if backend is not None:
+        await backend.start(_invalidate_local, _reset_local)
+
+
+async def close_cache() -> None:
+    if backend is not None:
+        await backend.close()
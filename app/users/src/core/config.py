@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 from functools import lru_cache
 from pydantic import computed_field
 from pydantic_settings import BaseSettings
@@ -11,18 +11,67 @@ class Settings(BaseSettings):
     DATABASE_PASSWORD: str
     DATABASE_NAME: str
     DATABASE_READ_HOST: Optional[str] = None
+    # Replaces the writer and reader URLs, as SQLite does for the load test
+    DATABASE_URL_OVERRIDE: Optional[str] = None
 
     # Pool settings
     DB_POOL_SIZE: int = 20
     DB_MAX_OVERFLOW: int = 30
     DB_POOL_TIMEOUT: int = 30
     DB_POOL_RECYCLE: int = 1800
+    DB_CONNECT_TIMEOUT: int = 5
+    DB_POOL_CHECKOUT_WARN_SECONDS: float = 0.1
+    DB_SLOW_QUERY_SECONDS: float = 0.5
+    DB_STATEMENT_TAGS: bool = True
+    DB_READ_STICKY_SECONDS: int = 5
+    DB_READ_AUTOCOMMIT: bool = True
+    DB_IN_CHUNK_SIZE: int = 500
+    DB_READ_RETRIES: int = 2
+    DB_RETRY_BACKOFF_SECONDS: float = 0.05
+    DB_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    DB_CIRCUIT_RESET_SECONDS: float = 5
+
+    # Pagination
+    USERS_PAGE_SIZE: int = 100
+    USERS_MAX_PAGE_SIZE: int = 1000
+    USERS_BATCH_MAX_IDS: int = 1000
+
+    # Cache
+    CACHE_MAX_SIZE: int = 10000
+    CACHE_TTL_SECONDS: int = 30
+    CACHE_BACKEND: Literal["local", "redis"] = "local"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_REDIS_TIMEOUT: float = 0.25
+    CACHE_INVALIDATION_CHANNEL: str = "cache-invalidations"
+
+    # Password hashing
+    PASSWORD_SCRYPT_N: int = 16384
+    PASSWORD_SCRYPT_R: int = 8
+    PASSWORD_SCRYPT_P: int = 1
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Health checks
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 10
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2
+
+    # Tracing
+    TRACING_EXPORTER: Literal["none", "file", "otlp"] = "none"
+    TRACING_SERVICE_NAME: str = "users"
+    TRACING_SAMPLE_RATIO: float = 0.01
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_EXPORT_TIMEOUT: float = 5
+    TRACING_EXPORT_INTERVAL_SECONDS: float = 1
+    TRACING_BATCH_SIZE: int = 512
+    TRACING_MAX_QUEUE_SIZE: int = 4096
 
     # Application
     ENVIRONMENT: str = "development"
     TESTING: bool = False
     DEBUG: bool = False
     LOG_LEVEL: str = "INFO"
+    # Defaults to rich in development and json anywhere else
+    LOG_FORMAT: Optional[Literal["rich", "json"]] = None
 
     class Config:
         env_file = ".env"
@@ -32,12 +81,14 @@ class Settings(BaseSettings):
     @property
     def DATABASE_URL(self) -> str:
         """Construct the main database URL from components"""
+        if self.DATABASE_URL_OVERRIDE:
+            return self.DATABASE_URL_OVERRIDE
         return f"mysql+asyncmy://{self.DATABASE_USER}:{self.DATABASE_PASSWORD}@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
 
     @computed_field
     @property
     def DATABASE_URL_READ(self) -> Optional[str]:
-        if self.DATABASE_READ_HOST:
+        if self.DATABASE_READ_HOST and not self.DATABASE_URL_OVERRIDE:
             return f"mysql+asyncmy://{self.DATABASE_USER}:{self.DATABASE_PASSWORD}@{self.DATABASE_READ_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
         return None
 
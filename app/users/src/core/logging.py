@@ -1,14 +1,139 @@
+"""Logging setup: Rich console output in development, JSON lines otherwise.
+
+In JSON mode the event loop only enqueues records; a QueueListener thread
+formats them and writes them to stdout, so log I/O stays off the request
+path. Every record carries the ID of the request that logged it, and the
+trace ID when the request is traced.
+"""
+
+import json
 import logging
-from rich.logging import RichHandler
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
 
 from src.core.config import settings
+from src.core.context import request_id
+from src.core.tracing import current_span
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", (), None)).keys()
+) | {"message", "asctime", "request_id", "trace_id"}
+
+# Loggers uvicorn configures with handlers of its own, writing on the loop
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: Optional[QueueListener] = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Add the IDs of the current request and trace; runs on the thread that logs"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        span = current_span.get()
+        record.trace_id = span.trace_id if span is not None else None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "trace_id": getattr(record, "trace_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+
+        return json.dumps(entry, default=str)
+
+
+class LogQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Arguments and tracebacks may change once the handler returns, so
+        # render them now; the JSON formatting and the I/O run in the listener
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _rich_handler() -> logging.Handler:
+    from rich.logging import RichHandler
+
+    return RichHandler(rich_tracebacks=False)
+
+
+def _json_handler() -> logging.Handler:
+    global _listener
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    return LogQueueHandler(records)
 
 
 def setup_logging() -> None:
+    shutdown_logging()
+
+    log_format = settings.LOG_FORMAT
+    if log_format is None:
+        log_format = "rich" if settings.ENVIRONMENT == "development" else "json"
+
+    if log_format == "rich":
+        handler = _rich_handler()
+    else:
+        handler = _json_handler()
+        for name in UVICORN_LOGGERS:
+            logging.getLogger(name).handlers.clear()
+            logging.getLogger(name).propagate = True
+    handler.addFilter(RequestIdFilter())
+
     logging.basicConfig(
         format="%(message)s",
         level=settings.LOG_LEVEL,
         datefmt="[%X]",
-        handlers=[RichHandler(rich_tracebacks=False)],
+        handlers=[handler],
         force=True,
     )
+
+
+def shutdown_logging() -> None:
+    """Write out the queued records and stop the listener thread.
+
+    Records logged afterwards are written directly by the listener's handler.
+    """
+    global _listener
+
+    if _listener is None:
+        return
+
+    _listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, LogQueueHandler):
+            root.removeHandler(handler)
+            for output in _listener.handlers:
+                output.addFilter(RequestIdFilter())
+                root.addHandler(output)
+    _listener = None
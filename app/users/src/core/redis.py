@@ -0,0 +1,252 @@
+"""Minimal asyncio client for the Redis protocol (RESP2).
+
+Implements only what the shared cache needs: pipelined commands over a single
+connection and a pub/sub listener for invalidations.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, List, Optional, Tuple, Union
+from urllib.parse import unquote, urlparse
+
+from src.core.cache import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+Arg = Union[str, bytes, int]
+
+
+class RedisError(Exception):
+    """Error reply sent by the server"""
+
+
+@dataclass(frozen=True)
+class RedisAddress:
+    host: str
+    port: int
+    db: int = 0
+    password: Optional[str] = None
+    username: Optional[str] = None
+    ssl: bool = False
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisAddress":
+        """Parse ``redis://[[user]:password@]host[:port][/db]`` (``rediss`` for TLS)"""
+        parsed = urlparse(url)
+        if parsed.scheme not in ("redis", "rediss"):
+            raise ValueError(f"Unsupported Redis URL scheme: {parsed.scheme}")
+
+        return cls(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(parsed.path.lstrip("/") or 0),
+            password=unquote(parsed.password) if parsed.password else None,
+            username=unquote(parsed.username) if parsed.username else None,
+            ssl=parsed.scheme == "rediss",
+        )
+
+
+def encode_command(*args: Arg) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, int):
+            arg = str(arg)
+        if isinstance(arg, str):
+            arg = arg.encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """Read one reply; error replies are returned, not raised, to keep order"""
+    line = await reader.readuntil(b"\r\n")
+    kind, payload = line[:1], line[1:-2]
+
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        return RedisError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+
+    raise RedisError(f"Unexpected reply type {kind!r}")
+
+
+async def open_connection(
+    address: RedisAddress, timeout: float
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Connect, authenticate and select the database"""
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(address.host, address.port, ssl=address.ssl or None),
+        timeout,
+    )
+
+    handshake: List[Tuple[Arg, ...]] = []
+    if address.password:
+        if address.username:
+            handshake.append(("AUTH", address.username, address.password))
+        else:
+            handshake.append(("AUTH", address.password))
+    if address.db:
+        handshake.append(("SELECT", address.db))
+
+    try:
+        for command in handshake:
+            writer.write(encode_command(*command))
+            reply = await asyncio.wait_for(read_reply(reader), timeout)
+            if isinstance(reply, RedisError):
+                raise reply
+    except BaseException:
+        writer.close()
+        raise
+
+    return reader, writer
+
+
+class RedisConnection:
+    """One connection shared by all the requests of a worker.
+
+    Commands are pipelined: each caller writes its command and waits for the
+    reply with the same position, so callers never queue behind a lock.
+    """
+
+    def __init__(self, address: RedisAddress, timeout: float) -> None:
+        self.address = address
+        self.timeout = timeout
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Deque[asyncio.Future] = deque()
+        self._connect_lock = asyncio.Lock()
+
+    async def execute(self, *args: Arg) -> Any:
+        writer = self._writer or await self._connect()
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        writer.write(encode_command(*args))
+
+        reply = await asyncio.wait_for(future, self.timeout)
+        if isinstance(reply, RedisError):
+            raise reply
+        return reply
+
+    async def close(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = None
+        self._fail_pending(ConnectionError("Redis connection closed"))
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        async with self._connect_lock:
+            if self._writer is None:
+                reader, writer = await open_connection(self.address, self.timeout)
+                self._reader_task = asyncio.create_task(self._read_replies(reader))
+                self._writer = writer
+            return self._writer
+
+    async def _read_replies(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                reply = await read_reply(reader)
+                future = self._pending.popleft()
+                if not future.done():
+                    future.set_result(reply)
+        except Exception as e:
+            logger.warning("Redis connection lost: %s", e)
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+            self._writer = None
+            self._fail_pending(ConnectionError("Redis connection lost"))
+
+    def _fail_pending(self, error: Exception) -> None:
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(error)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache backend for any server speaking the Redis protocol.
+
+    Invalidated keys are published on ``channel``; every replica subscribes to
+    it and drops the key from its in-process cache. A held key is stored as an
+    empty value, which fills with ``SET ... NX`` cannot overwrite.
+    """
+
+    def __init__(self, url: str, channel: str, timeout: float) -> None:
+        self.address = RedisAddress.from_url(url)
+        self.channel = channel
+        self.timeout = timeout
+        self.connection = RedisConnection(self.address, timeout)
+        self._listener: Optional[asyncio.Task] = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.connection.execute("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.connection.execute("SET", key, value, "EX", ttl, "NX")
+
+    async def delete(self, key: str, hold: float) -> None:
+        if hold > 0:
+            remove = self.connection.execute(
+                "SET", key, b"", "PX", max(int(hold * 1000), 1)
+            )
+        else:
+            remove = self.connection.execute("DEL", key)
+        await asyncio.gather(
+            remove, self.connection.execute("PUBLISH", self.channel, key)
+        )
+
+    async def start(
+        self, on_invalidate: Callable[[str], None], on_reset: Callable[[], None]
+    ) -> None:
+        self._listener = asyncio.create_task(self._listen(on_invalidate, on_reset))
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+        await self.connection.close()
+
+    async def _listen(
+        self, on_invalidate: Callable[[str], None], on_reset: Callable[[], None]
+    ) -> None:
+        delay = 0.1
+        while True:
+            writer: Optional[asyncio.StreamWriter] = None
+            try:
+                reader, writer = await open_connection(self.address, self.timeout)
+                writer.write(encode_command("SUBSCRIBE", self.channel))
+
+                # Invalidations published while disconnected were lost
+                on_reset()
+                delay = 0.1
+
+                while True:
+                    message = await read_reply(reader)
+                    if isinstance(message, list) and message[0] == b"message":
+                        on_invalidate(message[2].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Cache invalidation listener failed: %s", e)
+            finally:
+                if writer is not None:
+                    writer.close()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 5.0)
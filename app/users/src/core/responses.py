@@ -0,0 +1,29 @@
+from typing import Any, Mapping, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+class ModelResponse(Response):
+    """JSON response validated and serialized by pydantic-core in one call each.
+
+    Returning it from a route skips FastAPI's response_model handling, which
+    would validate every item again after the route already built it.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        adapter: TypeAdapter,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.adapter = adapter
+        super().__init__(content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(
+            self.adapter.validate_python(content, from_attributes=True)
+        )
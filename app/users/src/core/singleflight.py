@@ -0,0 +1,77 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+from src.core.metrics import Counter, Gauge
+
+T = TypeVar("T")
+
+calls_total = Counter(
+    "singleflight_calls_total", "Calls run by a single-flight group", ["group"]
+)
+coalesced_total = Counter(
+    "singleflight_coalesced_total",
+    "Callers served the result of a call already in flight",
+    ["group"],
+)
+in_flight = Gauge(
+    "singleflight_in_flight", "Calls of a single-flight group running", ["group"]
+)
+
+
+class _LeaderCancelled(Exception):
+    """The request running a shared call was cancelled before finishing it"""
+
+
+class SingleFlight(Generic[T]):
+    """Share one in-flight call between concurrent callers with the same key.
+
+    The first caller of a key (the leader) runs the call; callers arriving
+    while it runs wait for its result instead of running their own. Calls are
+    per worker process and only touched from its event loop, so no locking is
+    needed. If the leader is cancelled, one of the waiting callers takes over.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+        self._calls_total = calls_total.labels(name)
+        self._coalesced = coalesced_total.labels(name)
+        in_flight.labels(name).set_function(lambda: len(self._calls))
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        while (future := self._calls.get(key)) is not None:
+            try:
+                # Shielded so a cancelled follower does not cancel the leader
+                result = await asyncio.shield(future)
+            except _LeaderCancelled:
+                continue
+            except Exception:
+                self._coalesced.inc()
+                raise
+            self._coalesced.inc()
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self._calls_total.inc()
+        try:
+            result = await call()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.set_exception(_LeaderCancelled())
+            else:
+                future.set_exception(e)
+            # Retrieve it here so asyncio does not warn when nobody was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
+def create_single_flight(name: str) -> SingleFlight:
+    """Create a single-flight group, reporting to /metrics under its name"""
+    return SingleFlight(name)
@@ -0,0 +1,387 @@
+"""Distributed tracing compatible with OpenTelemetry.
+
+Spans follow the OpenTelemetry data model and are exported as OTLP/JSON,
+appended to a file or posted to an OTLP/HTTP collector. ``TracingMiddleware``
+opens a server span per request, continuing the trace of a W3C
+``traceparent`` header; repository methods and SQL statements add child
+spans to it.
+
+Sampling is decided once per trace, at its root: a caller's sampled flag is
+followed, otherwise TRACING_SAMPLE_RATIO of the traces are kept. Unsampled
+requests only carry their trace ID, for the logs, and create no child spans. The
+event loop only queues finished spans; a background thread exports them in
+batches, and drops spans rather than block when it falls behind.
+"""
+
+import json
+import logging
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+_TRACEPARENT_PATTERN = re.compile(
+    r"([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})(-.*)?"
+)
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+# OTLP enumerations
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+_random = random.Random()
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "kind",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "sampled",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+        "status_message",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        kind: int,
+        trace_id: str,
+        parent_id: Optional[str],
+        sampled: bool,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = f"{_random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes if attributes is not None else {}
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    def set_error(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = type(error).__name__
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        if self.sampled and exporter is not None:
+            exporter.enqueue(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+                if value is not None
+            ],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def parse_traceparent(value: str) -> Optional[Tuple[str, str, bool]]:
+    """Trace ID, parent span ID and sampled flag of a ``traceparent`` header"""
+    match = _TRACEPARENT_PATTERN.fullmatch(value.strip())
+    if match is None:
+        return None
+
+    version, trace_id, parent_id, flags, rest = match.groups()
+    if version == "ff" or (version == "00" and rest):
+        return None
+    if trace_id == _INVALID_TRACE_ID or parent_id == _INVALID_SPAN_ID:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 0x01)
+
+
+def should_sample(trace_id: str) -> bool:
+    """Keep TRACING_SAMPLE_RATIO of the traces, consistently per trace ID"""
+    return int(trace_id[16:], 16) < settings.TRACING_SAMPLE_RATIO * 2**64
+
+
+def start_root_span(
+    name: str, traceparent: Optional[str], attributes: Optional[Dict[str, Any]] = None
+) -> Span:
+    """Server span continuing the caller's trace, or starting a new one"""
+    parent = parse_traceparent(traceparent) if traceparent else None
+    if parent is not None:
+        trace_id, parent_id, sampled = parent
+    else:
+        trace_id, parent_id = f"{_random.getrandbits(128):032x}", None
+        sampled = should_sample(trace_id)
+    return Span(name, SPAN_KIND_SERVER, trace_id, parent_id, sampled, attributes)
+
+
+def start_child_span(
+    name: str, kind: int = SPAN_KIND_INTERNAL, attributes: Optional[Dict] = None
+) -> Optional[Span]:
+    """Child of the current span, or None when the trace is not sampled"""
+    parent = current_span.get()
+    if parent is None or not parent.sampled:
+        return None
+    return Span(name, kind, parent.trace_id, parent.span_id, True, attributes)
+
+
+class TracingMiddleware:
+    """Open a server span per request, named after the matched route"""
+
+    header = TRACEPARENT_HEADER.encode()
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == self.header:
+                traceparent = value.decode("latin-1")
+                break
+
+        method = scope["method"]
+        span = start_root_span(method, traceparent)
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = current_span.set(span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as error:
+            span.set_error(error)
+            raise
+        finally:
+            current_span.reset(token)
+            if span.sampled:
+                route = getattr(scope.get("route"), "path_format", None)
+                if route:
+                    span.name = f"{method} {route}"
+                span.attributes.update(
+                    {
+                        "http.request.method": method,
+                        "http.route": route,
+                        "url.path": scope["path"],
+                        "http.response.status_code": status,
+                    }
+                )
+                if status >= 500:
+                    span.status = STATUS_ERROR
+                span.end()
+
+
+def _otlp_payload(spans: List[Span]) -> Dict[str, Any]:
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {
+                            "key": "service.name",
+                            "value": {"stringValue": settings.TRACING_SERVICE_NAME},
+                        },
+                        {
+                            "key": "deployment.environment",
+                            "value": {"stringValue": settings.ENVIRONMENT},
+                        },
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [span.to_otlp() for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+def export_to_file(path: str) -> Callable[[List[Span]], None]:
+    """Append each batch as a line of OTLP/JSON, as the collector's file exporter does"""
+
+    def export(spans: List[Span]) -> None:
+        with open(path, "a", encoding="utf-8") as output:
+            output.write(json.dumps(_otlp_payload(spans)) + "\n")
+
+    return export
+
+
+def export_to_otlp(endpoint: str, timeout: float) -> Callable[[List[Span]], None]:
+    """Post each batch to an OTLP/HTTP collector as JSON"""
+
+    def export(spans: List[Span]) -> None:
+        request = urllib.request.Request(
+            endpoint,
+            data=json.dumps(_otlp_payload(spans)).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+
+    return export
+
+
+class BatchExporter:
+    """Export finished spans in batches from a background thread"""
+
+    _stop = object()
+
+    def __init__(
+        self,
+        export: Callable[[List[Span]], None],
+        max_queue_size: int,
+        batch_size: int,
+        interval: float,
+    ) -> None:
+        self.export = export
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(max_queue_size)
+        self._thread = threading.Thread(
+            target=self._run, name="span-exporter", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def enqueue(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Export the queued spans and stop the thread"""
+        self._queue.put(self._stop)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        batch: List[Span] = []
+        deadline = time.monotonic() + self.interval
+        while True:
+            try:
+                span = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                span = None
+
+            if span is self._stop:
+                self._flush(batch)
+                return
+            if span is not None:
+                batch.append(span)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.interval
+
+    def _flush(self, batch: List[Span]) -> None:
+        if self.dropped:
+            logger.warning("Dropped %d spans, the exporter fell behind", self.dropped)
+            self.dropped = 0
+        if not batch:
+            return
+        try:
+            self.export(batch)
+        except Exception:
+            logger.exception("Failed to export %d spans", len(batch))
+
+
+exporter: Optional[BatchExporter] = None
+
+
+def tracing_enabled() -> bool:
+    return settings.TRACING_EXPORTER != "none"
+
+
+def start_tracing() -> None:
+    global exporter
+
+    if not tracing_enabled() or exporter is not None:
+        return
+
+    if settings.TRACING_EXPORTER == "file":
+        export = export_to_file(settings.TRACING_FILE_PATH)
+    else:
+        export = export_to_otlp(
+            settings.TRACING_OTLP_ENDPOINT, settings.TRACING_EXPORT_TIMEOUT
+        )
+
+    exporter = BatchExporter(
+        export,
+        max_queue_size=settings.TRACING_MAX_QUEUE_SIZE,
+        batch_size=settings.TRACING_BATCH_SIZE,
+        interval=settings.TRACING_EXPORT_INTERVAL_SECONDS,
+    )
+    exporter.start()
+    logger.info(
+        "Exporting %.1f%% of traces to %s",
+        settings.TRACING_SAMPLE_RATIO * 100,
+        settings.TRACING_EXPORTER,
+    )
+
+
+def shutdown_tracing() -> None:
+    global exporter
+
+    if exporter is None:
+        return
+
+    exporter.close()
+    exporter = None
@@ -1,24 +1,173 @@
+import logging
+import time
+
+from sqlalchemy import event, make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
-from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from sqlalchemy.pool import NullPool
 
 from src.core.config import settings
+from src.core.context import repository_method, request_context
+from src.core.tracing import SPAN_KIND_CLIENT, current_span, start_child_span
+from src.db.pool import InstrumentedPool
+from src.db.resilience import primary_breaker, replica_breaker, watch_engine
+
+logger = logging.getLogger(__name__)
 
 
-def create_engine(url: str, is_testing: bool) -> AsyncEngine:
+def create_engine(
+    url: str, is_testing: bool, name: str, autocommit: bool = False
+) -> AsyncEngine:
+    # Statements of an autocommit engine run without BEGIN and COMMIT, and its
+    # connections return to the pool without a ROLLBACK
+    options = {}
+    if autocommit:
+        options = {"isolation_level": "AUTOCOMMIT", "skip_autocommit_rollback": True}
+
     if is_testing:
-        return create_async_engine(url, poolclass=NullPool, echo=settings.DEBUG)
+        return create_async_engine(
+            url, poolclass=NullPool, echo=settings.DEBUG, **options
+        )
+
+    # The connect timeout is asyncmy's; SQLite (the in-process load test) has none
+    if make_url(url).get_backend_name() == "mysql":
+        options["connect_args"] = {"connect_timeout": settings.DB_CONNECT_TIMEOUT}
 
     return create_async_engine(
         url,
-        poolclass=AsyncAdaptedQueuePool,
+        poolclass=InstrumentedPool,
+        pool_logging_name=name,
         pool_size=settings.DB_POOL_SIZE,
         max_overflow=settings.DB_MAX_OVERFLOW,
         pool_timeout=settings.DB_POOL_TIMEOUT,
         pool_recycle=settings.DB_POOL_RECYCLE,
-        pool_pre_ping=True,
+        # No ping per checkout: idle connections are pinged in the background,
+        # and a disconnect reconnects the whole pool (see src.db.resilience)
         echo=settings.DEBUG,
+        **options,
+    )
+
+
+def _statement_tag() -> str:
+    """SQL comment naming the route and repository method of a statement.
+
+    Tags show up in the database's own process list and slow query log.
+    """
+    context = request_context.get()
+    route = context.route if context else None
+    method = repository_method.get()
+    if not route and not method:
+        return ""
+
+    tags = []
+    if route:
+        tags.append(f"route='{route}'")
+    if method:
+        tags.append(f"repository='{method}'")
+    return " /*" + ",".join(tags).replace("*/", "").replace("%", "%%") + "*/"
+
+
+def _statement_span(conn, statement: str, executemany: bool):
+    """Client span of a statement, or None when the trace is not sampled"""
+    parent = current_span.get()
+    if parent is None or not parent.sampled:
+        return None
+
+    words = statement.split(None, 1)
+    operation = words[0].upper() if words else ""
+    url = conn.engine.url
+    return start_child_span(
+        f"{operation} {url.database}",
+        SPAN_KIND_CLIENT,
+        {
+            "db.system.name": conn.engine.dialect.name,
+            "db.namespace": url.database,
+            "db.operation.name": operation,
+            "db.query.text": statement[:2000],
+            "db.operation.batch": executemany or None,
+            "server.address": url.host,
+            "db.client.connection.pool.name": conn.engine.pool.logging_name,
+        },
+    )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(
+        (time.perf_counter(), _statement_span(conn, statement, executemany))
+    )
+    if settings.DB_STATEMENT_TAGS:
+        statement += _statement_tag()
+    return statement, parameters
+
+
+def _handle_error(exception_context):
+    """End the span of a failed statement, which has no after_cursor_execute"""
+    conn = exception_context.connection
+    if conn is None or exception_context.execution_context is None:
+        return
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+
+    _, span = started.pop()
+    if span is not None:
+        span.set_error(exception_context.original_exception)
+        span.end()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at, span = conn.info["query_started_at"].pop()
+    elapsed = time.perf_counter() - started_at
+    if span is not None:
+        span.end()
+
+    request = request_context.get()
+    if request is not None:
+        request.db_statements += 1
+        request.db_seconds += elapsed
+
+    if elapsed >= settings.DB_SLOW_QUERY_SECONDS:
+        route = request.route if request else None
+        method = repository_method.get()
+        logger.warning(
+            "Slow query took %.1fms in %s (%s)",
+            elapsed * 1000,
+            method or "unknown method",
+            route or "no route",
+            extra={
+                "duration_ms": round(elapsed * 1000, 3),
+                "route": route,
+                "repository_method": method,
+                "engine": conn.engine.pool.logging_name,
+                "executemany": executemany,
+                "statement": statement[:2000],
+            },
+        )
+
+
+def instrument_engine(engine: AsyncEngine) -> AsyncEngine:
+    """Tag, count and time the statements of ``engine``, logging slow ones"""
+    event.listen(
+        engine.sync_engine, "before_cursor_execute", _before_cursor_execute, retval=True
     )
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+    return engine
 
 
-engine = create_engine(settings.DATABASE_URL, settings.TESTING)
-read_engine = create_engine(settings.read_database_url, settings.TESTING)
+engine = watch_engine(
+    instrument_engine(
+        create_engine(settings.DATABASE_URL, settings.TESTING, "primary")
+    ),
+    primary_breaker,
+)
+read_engine = watch_engine(
+    instrument_engine(
+        create_engine(
+            settings.read_database_url,
+            settings.TESTING,
+            "replica",
+            autocommit=settings.DB_READ_AUTOCOMMIT,
+        )
+    ),
+    replica_breaker,
+)
@@ -1,4 +1,4 @@
-from src.db.models.base import Base
+from src.db.models.base import Base, current_timestamp_on_update, utc_now
 from src.db.models.users import User
 
-__all__ = ["Base", "User"]
+__all__ = ["Base", "User", "current_timestamp_on_update", "utc_now"]
@@ -1,9 +1,9 @@
-from datetime import datetime, timezone
+from datetime import datetime
 
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy import String, DateTime, Integer, Boolean, Index, text
 
-from src.db.models import Base
+from src.db.models import Base, current_timestamp_on_update, utc_now
 
 
 class User(Base):
@@ -19,14 +19,14 @@ class User(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
-        default=datetime.now(timezone.utc),
+        default=utc_now,
         server_default=text("CURRENT_TIMESTAMP"),
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
-        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        default=utc_now,
+        onupdate=utc_now,
+        server_default=current_timestamp_on_update(),
     )
 
     __table_args__ = (Index("idx_user_active_created", "is_active", "created_at"),)
@@ -0,0 +1,86 @@
+import logging
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+from src.core.config import settings
+from src.core.metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+checkout_seconds = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to get a connection from the pool, including opening a new one",
+    ["pool"],
+    buckets=(
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+        30.0,
+    ),
+)
+checkout_timeouts = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT",
+    ["pool"],
+)
+pool_size = Gauge("db_pool_size", "Connections kept open by the pool", ["pool"])
+pool_max_overflow = Gauge(
+    "db_pool_max_overflow", "Connections the pool may open beyond its size", ["pool"]
+)
+checked_out = Gauge(
+    "db_pool_checked_out", "Connections currently in use by requests", ["pool"]
+)
+overflow = Gauge(
+    "db_pool_overflow", "Connections currently open beyond the pool size", ["pool"]
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool recording checkout wait, timeouts and usage per engine.
+
+    The metrics label is the pool's ``logging_name``, set with the
+    ``pool_logging_name`` engine argument.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        name = self.logging_name or "default"
+
+        self._checkout_seconds = checkout_seconds.labels(name)
+        self._checkout_timeouts = checkout_timeouts.labels(name)
+        pool_size.labels(name).set(self.size())
+        pool_max_overflow.labels(name).set(self._max_overflow)
+        checked_out.labels(name).set_function(self.checkedout)
+        overflow.labels(name).set_function(lambda: max(self.overflow(), 0))
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self._checkout_timeouts.inc()
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self._checkout_seconds.observe(waited)
+            if waited > settings.DB_POOL_CHECKOUT_WARN_SECONDS:
+                logger.warning(
+                    "Waited %.3fs for a %s connection (%d in use, %d overflow)",
+                    waited,
+                    self.logging_name,
+                    self.checkedout(),
+                    max(self.overflow(), 0),
+                )
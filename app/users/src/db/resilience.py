@@ -0,0 +1,211 @@
+"""Recovery from lost database connections, in place of a ping per checkout.
+
+Connections are not pinged when they leave the pool; the health prober pings
+the idle ones in the background instead (see src.core.health). A statement
+that fails on a dead connection is a disconnect: SQLAlchemy then invalidates
+the whole pool, so every connection opened before the failure is replaced on
+its next checkout rather than failing in turn. Besides the driver's own
+disconnect errors, the errors an Aurora failover causes count as disconnects:
+connections to the cluster endpoint that still reach the demoted writer fail
+with read-only errors until they are reopened against the new one.
+
+Each engine has a ``CircuitBreaker``: after DB_CIRCUIT_FAILURE_THRESHOLD
+consecutive disconnects it opens, and sessions are refused with
+``DatabaseUnavailableError`` (a 503) instead of waiting up to DB_POOL_TIMEOUT
+for connections that cannot be opened. Every DB_CIRCUIT_RESET_SECONDS one
+request is let through to try again; the first successful statement, from a
+request or from the health prober, closes the circuit.
+
+Idempotent reads from the replica decorated with ``retry_read`` are retried
+after a disconnect, with jittered exponential backoff. Requests whose reads
+run out of retries, or whose writes lose their connection, get a 503 too.
+"""
+
+import asyncio
+import functools
+import logging
+import random
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.config import settings
+from src.core.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# MySQL errors of a failover, besides those the driver reports as disconnects:
+# unreachable or unresolvable hosts, and writes reaching a demoted writer
+FAILOVER_ERRORS = frozenset(
+    {
+        2002,  # CR_CONNECTION_ERROR
+        2003,  # CR_CONN_HOST_ERROR
+        2005,  # CR_UNKNOWN_HOST
+        1290,  # ER_OPTION_PREVENTS_STATEMENT (--read-only)
+        1792,  # ER_CANT_EXECUTE_IN_READ_ONLY_TRANSACTION
+        1836,  # ER_READ_ONLY_MODE
+    }
+)
+
+disconnects = Counter(
+    "db_disconnects_total",
+    "Statements and connection attempts that failed on a lost connection",
+    ["pool"],
+)
+circuit_open = Gauge(
+    "db_circuit_open", "Whether sessions are refused after disconnects", ["pool"]
+)
+circuit_rejections = Counter(
+    "db_circuit_rejections_total",
+    "Sessions refused while the circuit was open",
+    ["pool"],
+)
+read_retries = Counter(
+    "db_read_retries_total", "Reads retried after a disconnect", ["repository"]
+)
+
+
+class DatabaseUnavailableError(Exception):
+    """The database cannot be reached, answered with a 503"""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(f"The {name} database is unavailable")
+        self.name = name
+
+
+class CircuitBreaker:
+    """Count consecutive disconnects of an engine and fail fast past a threshold"""
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._retry_at = 0.0
+
+        self._rejections = circuit_rejections.labels(name)
+        circuit_open.labels(name).set_function(lambda: float(self.is_open))
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def check(self) -> None:
+        """Raise DatabaseUnavailableError while open, but for one trial per period"""
+        if self.opened_at is None:
+            return
+
+        now = time.monotonic()
+        if now >= self._retry_at:
+            self._retry_at = now + self.reset_seconds
+            return
+
+        self._rejections.inc()
+        raise DatabaseUnavailableError(self.name)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures < self.failure_threshold:
+            return
+
+        now = time.monotonic()
+        self._retry_at = now + self.reset_seconds
+        if self.opened_at is None:
+            self.opened_at = now
+            logger.error(
+                "Opened the %s database circuit after %d disconnects",
+                self.name,
+                self.failures,
+            )
+
+    def record_success(self) -> None:
+        if not self.failures:
+            return
+
+        if self.opened_at is not None:
+            logger.warning(
+                "Closed the %s database circuit after %.1fs",
+                self.name,
+                time.monotonic() - self.opened_at,
+            )
+        self.failures = 0
+        self.opened_at = None
+
+
+primary_breaker = CircuitBreaker(
+    "primary", settings.DB_CIRCUIT_FAILURE_THRESHOLD, settings.DB_CIRCUIT_RESET_SECONDS
+)
+replica_breaker = CircuitBreaker(
+    "replica", settings.DB_CIRCUIT_FAILURE_THRESHOLD, settings.DB_CIRCUIT_RESET_SECONDS
+)
+
+
+def _error_code(error: BaseException) -> Optional[int]:
+    args = getattr(error, "args", ())
+    return args[0] if args and isinstance(args[0], int) else None
+
+
+def watch_engine(engine: AsyncEngine, breaker: CircuitBreaker) -> AsyncEngine:
+    """Treat failover errors as disconnects and report them to ``breaker``"""
+
+    def handle_error(exception_context) -> None:
+        if exception_context.is_pre_ping:
+            return
+        if not exception_context.is_disconnect:
+            if _error_code(exception_context.original_exception) not in FAILOVER_ERRORS:
+                return
+            # Invalidates the connection, and the pool with it
+            exception_context.is_disconnect = True
+
+        disconnects.labels(breaker.name).inc()
+        breaker.record_failure()
+        logger.warning(
+            "Lost a %s database connection, reconnecting the pool: %r",
+            breaker.name,
+            exception_context.original_exception,
+        )
+
+    def after_cursor_execute(*args) -> None:
+        breaker.record_success()
+
+    event.listen(engine.sync_engine, "handle_error", handle_error)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    return engine
+
+
+def retry_read(method):
+    """Retry a repository read on the replica after a disconnect.
+
+    Up to DB_READ_RETRIES times, sleeping a random time up to
+    DB_RETRY_BACKOFF_SECONDS * 2 ** attempt ("full jitter") in between, so
+    the requests that failed together do not reconnect in lockstep. Reads on
+    the writer share their transaction with the request's writes and are
+    never retried.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                return await method(self, *args, **kwargs)
+            except DBAPIError as error:
+                if not (error.connection_invalidated and self._on_replica()):
+                    raise
+                if attempt >= settings.DB_READ_RETRIES:
+                    raise DatabaseUnavailableError(replica_breaker.name) from error
+                attempt += 1
+
+            # Drops the invalidated connection; the next statement checks out another
+            await self.session.close()
+            await asyncio.sleep(
+                random.uniform(0, settings.DB_RETRY_BACKOFF_SECONDS * 2**attempt)
+            )
+            replica_breaker.check()
+            read_retries.labels(f"{type(self).__name__}.{method.__name__}").inc()
+
+    return wrapper
@@ -3,6 +3,28 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from src.db.engine import engine, read_engine
 
 
+class ReadSession(AsyncSession):
+    """Session returning its connection to the pool after every statement.
+
+    A connection is checked out when a statement runs, and released as soon
+    as the statement's rows are fetched, instead of being held until the
+    request ends. On the autocommit read engine, neither the statements nor
+    the release cost a BEGIN, COMMIT or ROLLBACK round trip. Streams hold
+    their connection until they are exhausted, as they must.
+    """
+
+    async def execute(self, *args, **kwargs):
+        result = await super().execute(*args, **kwargs)
+        rows = result.freeze()
+        await self.close()
+        return rows()
+
+    async def scalar(self, *args, **kwargs):
+        value = await super().scalar(*args, **kwargs)
+        await self.close()
+        return value
+
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -13,8 +35,9 @@ AsyncSessionLocal = async_sessionmaker(
 
 AsyncReadSessionLocal = async_sessionmaker(
     bind=read_engine,
-    class_=AsyncSession,
+    class_=ReadSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
+    info={"read_only": True},
 )
@@ -1,6 +1,111 @@
+"""Password hashing with scrypt, run off the event loop.
+
+A scrypt hash takes tens of milliseconds of CPU by design, so hashing and
+verification run in a bounded thread pool (hashlib releases the GIL while
+deriving the key). Hashes are stored as::
+
+    scrypt$<n>$<r>$<p>$<salt>$<key>
+
+with base64 salt and key, so the cost can be raised without invalidating the
+stored hashes. Unsalted SHA-256 hex digests from before still verify and are
+reported by ``needs_rehash``, to be upgraded on the next login.
+"""
+
+import asyncio
+import base64
 import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from src.core.config import settings
+
+ALGORITHM = "scrypt"
+SALT_SIZE = 16
+KEY_SIZE = 32
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password"
+)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        # scrypt needs 128 * n * r bytes, give it twice that
+        maxmem=256 * n * r * p,
+        dklen=KEY_SIZE,
+    )
+
+
+def _is_legacy(hashed: str) -> bool:
+    return not hashed.startswith(f"{ALGORITHM}$")
+
+
+def hash_password_sync(password: str) -> str:
+    """Hash on the calling thread; use ``hash_password`` from async code"""
+    n, r, p = (
+        settings.PASSWORD_SCRYPT_N,
+        settings.PASSWORD_SCRYPT_R,
+        settings.PASSWORD_SCRYPT_P,
+    )
+    salt = os.urandom(SALT_SIZE)
+    key = _scrypt(password, salt, n, r, p)
+    return f"{ALGORITHM}${n}${r}${p}${_b64encode(salt)}${_b64encode(key)}"
+
+
+def verify_password_sync(password: str, hashed: str) -> bool:
+    """Verify on the calling thread; use ``verify_password`` from async code"""
+    if _is_legacy(hashed):
+        digest = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(digest, hashed)
+
+    try:
+        _, n, r, p, salt, key = hashed.split("$")
+        expected = base64.b64decode(key)
+        derived = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    except ValueError:
+        return False
+    return hmac.compare_digest(derived, expected)
+
+
+def needs_rehash(hashed: str) -> bool:
+    """Whether a hash is legacy SHA-256 or uses other than the configured cost"""
+    if _is_legacy(hashed):
+        return True
+
+    _, n, r, p, _, _ = hashed.split("$")
+    return (int(n), int(r), int(p)) != (
+        settings.PASSWORD_SCRYPT_N,
+        settings.PASSWORD_SCRYPT_R,
+        settings.PASSWORD_SCRYPT_P,
+    )
+
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, hash_password_sync, password)
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, partial(verify_password_sync, password, hashed)
+    )
+
+
+# Hash of a random password, checked when logging in with an unknown email
+DUMMY_HASH = hash_password_sync(os.urandom(SALT_SIZE).hex())
 
 
-def hash_password(password: str) -> str:
-    """Simple password hashing (use bcrypt in production)"""
-    return hashlib.sha256(password.encode()).hexdigest()
+def shutdown_hasher() -> None:
+    executor.shutdown(wait=True, cancel_futures=True)
@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
-from pydantic import BaseModel, EmailStr, ConfigDict, Field
+from pydantic import BaseModel, EmailStr, ConfigDict, Field, TypeAdapter
 
 
 class UserBase(BaseModel):
@@ -13,6 +13,11 @@ class UserCreate(UserBase):
     password: str = Field(min_length=6, max_length=20, examples=["pass1234*"])
 
 
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str = Field(examples=["pass1234*"])
+
+
 class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     name: Optional[str] = None
@@ -28,5 +33,16 @@ class UserResponse(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+UserResponseList = TypeAdapter(List[UserResponse])
+
+
+class UserBatchResponse(BaseModel):
+    users: Dict[int, UserResponse]
+    missing: List[int]
+
+
+UserBatch = TypeAdapter(UserBatchResponse)
+
+
 class UserInDB(UserResponse):
     hashed_password: str
@@ -1,24 +1,124 @@
-from typing import Optional
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
 
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import Row, or_, select, update, delete
+from sqlalchemy.exc import IntegrityError
 from pydantic import EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.cache import create_cache
+from src.core.config import settings
+from src.core.context import tag_repository
+from src.core.singleflight import create_single_flight
 from src.db.models import User
-from src.schemas.users import UserBase, UserUpdate
+from src.db.resilience import retry_read
+from src.schemas.users import UserBase, UserResponse, UserUpdate
 
+user_cache = create_cache("users", UserResponse)
+user_flight = create_single_flight("users")
 
+# MySQL error code for a duplicate entry in a unique index
+ER_DUP_ENTRY = 1062
+# SQLite extended error code of the same, for the SQLite load test
+SQLITE_CONSTRAINT_UNIQUE = 2067
+
+
+class DuplicateEmailError(Exception):
+    """The email is already registered to another user"""
+
+
+def _is_duplicate_entry(error: IntegrityError) -> bool:
+    if getattr(error.orig, "sqlite_errorcode", None) == SQLITE_CONSTRAINT_UNIQUE:
+        return True
+    args = getattr(error.orig, "args", ())
+    return bool(args) and args[0] == ER_DUP_ENTRY
+
+
+# Reads select the UserResponse columns as plain rows, skipping ORM entity
+# hydration and never loading hashed_password
+USER_COLUMNS = (
+    User.id,
+    User.email,
+    User.name,
+    User.lastname,
+    User.is_active,
+    User.created_at,
+    User.updated_at,
+)
+
+
+@tag_repository
 class UserRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_user_by_id(self, id: int) -> Optional[User]:
-        result = await self.session.execute(select(User).where(User.id == id))
-        return result.scalar_one_or_none()
+    @retry_read
+    async def get_user_by_id(self, id: int) -> Optional[UserResponse]:
+        """Return a user.
 
-    async def get_user_by_email(self, email: EmailStr) -> Optional[User]:
-        result = await self.session.execute(select(User).where(User.email == email))
-        return result.scalar_one_or_none()
+        Reads from the replica are served from the cache, and concurrent misses
+        for the same user share a single query.
+        """
+        if not self._on_replica():
+            return await self._select_user(id)
+
+        if (cached := await user_cache.get(id)) is not None:
+            return cached
+
+        return await user_flight.do(id, lambda: self._select_and_cache_user(id))
+
+    @retry_read
+    async def get_users_by_ids(self, ids: Sequence[int]) -> Dict[int, Row]:
+        """Return the users with the given IDs keyed by ID, without the missing ones.
+
+        Runs one IN query per DB_IN_CHUNK_SIZE IDs, so a page of owners is a
+        single statement.
+        """
+        users: Dict[int, Row] = {}
+        chunk_size = settings.DB_IN_CHUNK_SIZE
+        for start in range(0, len(ids), chunk_size):
+            result = await self.session.execute(
+                select(*USER_COLUMNS).where(
+                    User.id.in_(ids[start : start + chunk_size])
+                )
+            )
+            users.update((user.id, user) for user in result)
+        return users
+
+    @retry_read
+    async def list_users(
+        self,
+        is_active: bool,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None,
+    ) -> Sequence[Row]:
+        """Return up to ``limit`` users ordered by (created_at, id), after the cursor.
+
+        idx_user_active_created, which InnoDB extends with the primary key,
+        holds the users of each is_active value in exactly this order, so a
+        page is a range read of ``limit`` entries however deep it is.
+        """
+        query = select(*USER_COLUMNS).where(User.is_active == is_active)
+        if after is not None:
+            created_at, id = after
+            # Spelled out rather than as a row comparison so MySQL reads a
+            # range of the index starting at created_at
+            query = query.where(
+                User.created_at >= created_at,
+                or_(User.created_at > created_at, User.id > id),
+            )
+
+        result = await self.session.execute(
+            query.order_by(User.created_at, User.id).limit(limit)
+        )
+        return result.all()
+
+    async def get_credentials(self, email: EmailStr) -> Optional[Row]:
+        """Return the user with its password hash, to authenticate it"""
+        result = await self.session.execute(
+            select(*USER_COLUMNS, User.hashed_password).where(User.email == email)
+        )
+        return result.one_or_none()
 
     async def create_user(self, user_data: UserBase, hashed_password: str) -> User:
         user = User(
@@ -28,29 +128,82 @@ class UserRepository:
             hashed_password=hashed_password,
         )
 
+        # Defaults are generated by the application, so the INSERT is all it takes.
+        # The unique index on email rejects duplicates, even concurrent ones
         self.session.add(user)
-        await self.session.flush()
-        await self.session.refresh(user)
+        try:
+            await self.session.flush()
+        except IntegrityError as e:
+            if _is_duplicate_entry(e):
+                raise DuplicateEmailError(user_data.email) from e
+            raise
         return user
 
-    async def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
+    async def update_user(
+        self, user_id: int, user_data: UserUpdate
+    ) -> Optional[UserResponse]:
+        """Update a user and return its new state, or None when it does not exist.
+
+        Databases supporting UPDATE ... RETURNING do it in one statement. MySQL
+        reports not-found from the UPDATE row count and only then reads the row.
+        Raises DuplicateEmailError when the new email belongs to another user.
+        """
         update_data = user_data.model_dump(exclude_unset=True)
 
         if not update_data:
             return await self.get_user_by_id(user_id)
 
+        returning = self.session.bind.dialect.update_returning
+        statement = update(User).where(User.id == user_id).values(**update_data)
+        if returning:
+            statement = statement.returning(*USER_COLUMNS)
+
+        try:
+            result = await self.session.execute(statement)
+        except IntegrityError as e:
+            if _is_duplicate_entry(e):
+                raise DuplicateEmailError(update_data["email"]) from e
+            raise
+
+        if returning:
+            user = result.one_or_none()
+        else:
+            user = None
+            if result.rowcount > 0:  # type: ignore[attr-defined]
+                result = await self.session.execute(
+                    select(*USER_COLUMNS).where(User.id == user_id)
+                )
+                user = result.one()
+
+        user_cache.delete_after_commit(self.session, user_id)
+        return UserResponse.model_validate(user) if user else None
+
+    async def update_password(self, user_id: int, hashed_password: str) -> None:
         await self.session.execute(
-            update(User).where(User.id == user_id).values(**update_data)
+            update(User)
+            .where(User.id == user_id)
+            .values(hashed_password=hashed_password)
         )
-        await self.session.flush()
-        return await self.get_user_by_id(user_id)
+        # updated_at changes with the password
+        user_cache.delete_after_commit(self.session, user_id)
 
     async def delete(self, user_id: int) -> bool:
         result = await self.session.execute(delete(User).where(User.id == user_id))
+        user_cache.delete_after_commit(self.session, user_id)
         return result.rowcount > 0  # type: ignore[attr-defined]
 
-    async def exists(self, email: EmailStr) -> bool:
-        result = await self.session.execute(
-            select(func.count(User.id)).where(User.email == email)
-        )
-        return result.scalar_one() > 0
+    def _on_replica(self) -> bool:
+        # Reads from the writer must see the client's own writes, which a
+        # cached or in-flight result may predate, so they always hit the table
+        return self.session.info.get("read_only", False)
+
+    async def _select_user(self, id: int) -> Optional[UserResponse]:
+        result = await self.session.execute(select(*USER_COLUMNS).where(User.id == id))
+        user = result.one_or_none()
+        return UserResponse.model_validate(user) if user else None
+
+    async def _select_and_cache_user(self, id: int) -> Optional[UserResponse]:
+        response = await self._select_user(id)
+        if response is not None:
+            await user_cache.set(id, response)
+        return response
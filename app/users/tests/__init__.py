@@ -0,0 +1,11 @@
+import os
+
+# Required by the settings; the tests do not open database connections
+for name, value in (
+    ("DATABASE_HOST", "localhost"),
+    ("DATABASE_PORT", "3306"),
+    ("DATABASE_USER", "test"),
+    ("DATABASE_PASSWORD", "test"),
+    ("DATABASE_NAME", "test"),
+):
+    os.environ.setdefault(name, value)
@@ -0,0 +1,82 @@
+import asyncio
+import unittest
+
+from pydantic import BaseModel
+
+from scripts.fake_redis import FakeRedisServer
+from src.core.cache import Cache, _invalidate_local, _reset_local, caches
+from src.core.config import settings
+from src.core.redis import RedisCacheBackend
+
+CHANNEL = "test-invalidations"
+
+
+class Record(BaseModel):
+    id: int
+    name: str
+
+
+async def wait_for(condition, timeout: float = 2) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() >= deadline:
+            raise AssertionError("Timed out waiting for the condition")
+        await asyncio.sleep(0.01)
+
+
+class SharedInvalidationTest(unittest.IsolatedAsyncioTestCase):
+    """Two replicas sharing a Redis backend, each with its own in-process cache"""
+
+    async def asyncSetUp(self) -> None:
+        self.server = FakeRedisServer()
+        await self.server.start()
+        self.addAsyncCleanup(self.server.close)
+
+        self.writer = Cache("records", Record, self._backend())
+        self.reader = Cache("records", Record, self._backend())
+        # The reader is the cache its replica's listener invalidates
+        caches["records"] = self.reader
+        self.addCleanup(caches.pop, "records", None)
+
+        await self.reader.backend.start(_invalidate_local, _reset_local)
+        await wait_for(lambda: self.server.subscribers.get(CHANNEL.encode()))
+
+    def _backend(self) -> RedisCacheBackend:
+        backend = RedisCacheBackend(self.server.url, channel=CHANNEL, timeout=1)
+        self.addAsyncCleanup(backend.close)
+        return backend
+
+    async def test_write_evicts_the_other_replicas_entry(self) -> None:
+        await self.reader.set(1, Record(id=1, name="old"))
+        self.assertEqual(self.reader.local.get("records:1"), Record(id=1, name="old"))
+
+        await self.writer.delete(1)
+
+        await wait_for(lambda: self.reader.local.get("records:1") is None)
+        # Held on both tiers: the reader neither serves nor caches the old record
+        self.assertIsNone(await self.reader.get(1))
+        await self.reader.set(1, Record(id=1, name="old"))
+        self.assertIsNone(await self.reader.get(1))
+
+    async def test_write_leaves_other_entries(self) -> None:
+        await self.reader.set(1, Record(id=1, name="one"))
+        await self.reader.set(2, Record(id=2, name="two"))
+
+        await self.writer.delete(1)
+
+        await wait_for(lambda: self.reader.local.get("records:1") is None)
+        self.assertEqual(await self.reader.get(2), Record(id=2, name="two"))
+
+
+class LocalCacheTest(unittest.TestCase):
+    def test_entries_expire_within_the_read_your_writes_window(self) -> None:
+        # Without a backend other workers never hear of a write
+        cache = Cache("records", Record)
+        self.assertEqual(
+            cache.local.ttl,
+            min(settings.CACHE_TTL_SECONDS, settings.DB_READ_STICKY_SECONDS),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
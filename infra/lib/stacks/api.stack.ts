@@ -32,13 +32,13 @@ export class AlbStack extends Stack {
     this.usersTg = new TargetGroupStandard(this, "users-tg", {
       targetGroupName: "users-tg",
       vpc: props.vpc,
-      healthCheckPath: "/health",
+      healthCheckPath: "/health/ready",
     });
 
     this.tasksTg = new TargetGroupStandard(this, "tasks-tg", {
       targetGroupName: "tasks-tg",
       vpc: props.vpc,
-      healthCheckPath: "/health",
+      healthCheckPath: "/health/ready",
     });
 
     new ApplicationListenerRule(this, "users-listener-rule", {
@@ -55,7 +55,7 @@ export class ServicesStack extends Stack {
             healthCheck: {
               command: [
                 "CMD-SHELL",
-                "wget --no-verbose --tries=1 --spider http://localhost:80/health/ || exit 1",
+                "wget --no-verbose --tries=1 --spider http://localhost:80/health/live || exit 1",
               ],
               interval: Duration.seconds(15),
               timeout: Duration.seconds(5),
@@ -68,6 +68,7 @@ export class ServicesStack extends Stack {
             }),
             environment: {
               DATABASE_NAME: "users_db",
+              ENVIRONMENT: "production",
               DATABASE_READ_HOST: props.dbCluster.clusterReadEndpoint.hostname,
             },
             secrets: {
@@ -107,7 +108,7 @@ export class ServicesStack extends Stack {
             healthCheck: {
               command: [
                 "CMD-SHELL",
-                "wget --no-verbose --tries=1 --spider http://localhost:80/health/ || exit 1",
+                "wget --no-verbose --tries=1 --spider http://localhost:80/health/live || exit 1",
               ],
               interval: Duration.seconds(15),
               timeout: Duration.seconds(5),
@@ -120,6 +121,7 @@ export class ServicesStack extends Stack {
             }),
             environment: {
               DATABASE_NAME: "tasks_db",
+              ENVIRONMENT: "production",
               DATABASE_READ_HOST: props.dbCluster.clusterReadEndpoint.hostname,
             },
             secrets: {